@@ -0,0 +1,72 @@
+"""resizing resting orders with amend_order against cancelling and re-adding
+
+run from the repository root with `python -m benchmarks.bench_amend [n]`
+"""
+import sys
+import time
+from decimal import Decimal
+
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def resting_orders(platform: Platform, n: int):
+    return [
+        platform.add_order(
+            LimitOrder(
+                symbol="FOOBAR",
+                size=1000,
+                side="buy",
+                price=Decimal(9000 + i % 500) / 100,
+                user_id="maker",
+            )
+        )
+        for i in range(n)
+    ]
+
+
+def cancel_and_add(platform: Platform, orders) -> float:
+    start = time.perf_counter()
+    for order in orders:
+        platform.cancel_order(order.order_id, "FOOBAR")
+        platform.add_order(
+            LimitOrder(
+                symbol="FOOBAR",
+                size=order.size - 1,
+                side=order.side,
+                price=order.price,
+                user_id=order.user_id,
+            )
+        )
+    return time.perf_counter() - start
+
+
+def amend_size(platform: Platform, orders) -> float:
+    start = time.perf_counter()
+    for order in orders:
+        platform.amend_order(order.order_id, new_size=order.size - 1, symbol="FOOBAR")
+    return time.perf_counter() - start
+
+
+def amend_price(platform: Platform, orders) -> float:
+    tick = Decimal("0.01")
+    start = time.perf_counter()
+    for order in orders:
+        platform.amend_order(
+            order.order_id, new_price=order.price - tick, symbol="FOOBAR"
+        )
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    for name, run in (
+        ("cancel and add", cancel_and_add),
+        ("amend size down", amend_size),
+        ("amend price", amend_price),
+    ):
+        platform = Platform()
+        orders = resting_orders(platform, n)
+        elapsed = run(platform, orders)
+        print(f"{name:16} {elapsed / n * 1e6:8.1f} us/order")
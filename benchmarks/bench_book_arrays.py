@@ -0,0 +1,57 @@
+"""order_book() -> arrays via pydantic PriceLevels vs order_book_arrays()
+
+run from the repository root with `python -m benchmarks.bench_book_arrays`
+"""
+import random
+import timeit
+from decimal import Decimal
+
+import numpy as np
+
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def populated_platform(levels: int, orders_per_level: int = 3) -> Platform:
+    platform = Platform()
+    rng = random.Random(0)
+    for i in range(levels):
+        for _ in range(orders_per_level):
+            size = Decimal(rng.randint(1, 1000)) / 100
+            platform.add_order(
+                LimitOrder(symbol="FOOBAR", size=size, side="buy", price=1000 - i)
+            )
+            platform.add_order(
+                LimitOrder(symbol="FOOBAR", size=size, side="sell", price=1001 + i)
+            )
+    return platform
+
+
+def via_pydantic(platform: Platform, depth: int):
+    ob = platform.order_book("FOOBAR")
+    bids, asks = ob.bids[:depth], ob.asks[:depth]
+    return (
+        np.array([float(level.price) for level in bids]),
+        np.array([float(level.quantity) for level in bids]),
+        np.array([float(level.price) for level in asks]),
+        np.array([float(level.quantity) for level in asks]),
+    )
+
+
+if __name__ == "__main__":
+    for levels in (10, 100, 1000):
+        platform = populated_platform(levels)
+        for depth in sorted({10, levels}):
+            number = max(10, 10_000 // levels)
+            pydantic_time = timeit.timeit(
+                lambda: via_pydantic(platform, depth), number=number
+            )
+            arrays_time = timeit.timeit(
+                lambda: platform.order_book_arrays("FOOBAR", depth), number=number
+            )
+            print(
+                f"levels={levels:5d} depth={depth:5d} "
+                f"pydantic {pydantic_time / number * 1e6:10.1f} us  "
+                f"arrays {arrays_time / number * 1e6:8.1f} us  "
+                f"x{pydantic_time / arrays_time:.0f}"
+            )
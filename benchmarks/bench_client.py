@@ -0,0 +1,98 @@
+"""order submission through the HTTP client against direct Platform calls
+
+the API is served by uvicorn on a thread of this process, so the client pays
+for serialisation, HTTP and the event loop but not a network hop
+
+run from the repository root with `python -m benchmarks.bench_client [n]`
+"""
+import asyncio
+import random
+import socket
+import sys
+import threading
+import time
+from decimal import Decimal
+
+import uvicorn
+
+from pumpdump.client import AsyncPlatformClient, PlatformClient
+from pumpdump.main import create_app
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def orders(n: int):
+    rng = random.Random(0)
+    return [
+        LimitOrder(
+            symbol="FOOBAR",
+            size=Decimal(rng.randint(1, 100)),
+            side=rng.choice(("buy", "sell")),
+            price=Decimal(rng.randint(9900, 10100)) / 100,
+            user_id=f"user{rng.randint(0, 9)}",
+        )
+        for _ in range(n)
+    ]
+
+
+def serve(platform: Platform):
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(platform), log_level="warning", lifespan="off")
+    )
+    thread = threading.Thread(
+        target=server.run, kwargs={"sockets": [sock]}, daemon=True
+    )
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, "http://127.0.0.1:%d" % sock.getsockname()[1]
+
+
+def timed(name: str, n: int, submit) -> None:
+    platform = Platform()
+    server, thread, url = serve(platform)
+    batch = orders(n)
+    try:
+        start = time.perf_counter()
+        submit(platform, url, batch)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        thread.join()
+    print(f"{name:28} {n / elapsed:10.0f} orders/s {elapsed / n * 1e6:8.1f} us/order")
+
+
+def direct(platform, url, batch):
+    for order in batch:
+        platform.add_order(order)
+
+
+def one_by_one(platform, url, batch):
+    with PlatformClient(url) as client:
+        for order in batch:
+            client.add_order(order)
+
+
+def batched(platform, url, batch):
+    with PlatformClient(url) as client:
+        client.add_orders(batch)
+
+
+def batched_async(platform, url, batch):
+    async def submit():
+        async with AsyncPlatformClient(url, batch_size=100) as client:
+            await client.add_orders(batch)
+
+    asyncio.run(submit())
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+    timed("direct Platform.add_order", n, direct)
+    timed("client.add_order", n, one_by_one)
+    timed("client.add_orders", n, batched)
+    timed("async client.add_orders", n, batched_async)
@@ -0,0 +1,65 @@
+"""load time for large symbol/balance files in each format, validated and trusted
+
+run from the repository root with
+`python -m benchmarks.bench_config_loader [n_symbols] [n_users]`
+"""
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from pumpdump import config_loader
+from pumpdump._config import InitialBalance, SymbolConfig
+from pumpdump.platform.platform import Platform
+
+
+def generate(directory: Path, n_symbols: int, n_users: int) -> None:
+    symbol_configs = [
+        SymbolConfig.construct(
+            symbol=f"SYM{i}",
+            price_tick=Decimal("0.01"),
+            size_tick=Decimal("0.001"),
+            min_size=Decimal("0.001"),
+            base=f"BASE{i}",
+            quote="USD",
+        )
+        for i in range(n_symbols)
+    ]
+    initial_balances = [InitialBalance.construct(user_id=None, balances={})] + [
+        InitialBalance.construct(
+            user_id=f"user{i}",
+            balances={"USD": Decimal(1_000_000), f"BASE{i % n_symbols}": Decimal(10)},
+        )
+        for i in range(n_users)
+    ]
+
+    for suffix in (".csv", ".jsonl", ".bin"):
+        config_loader.write_symbol_configs(
+            directory / f"symbols{suffix}", symbol_configs
+        )
+        config_loader.write_initial_balances(
+            directory / f"balances{suffix}", initial_balances
+        )
+
+
+if __name__ == "__main__":
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_users = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        generate(directory, n_symbols, n_users)
+
+        for suffix in (".csv", ".jsonl", ".bin"):
+            for trusted in (False, True):
+                start = time.perf_counter()
+                config = config_loader.load_platform_config(
+                    directory / f"symbols{suffix}",
+                    directory / f"balances{suffix}",
+                    trusted=trusted,
+                )
+                Platform(config)
+                elapsed = time.perf_counter() - start
+                label = "trusted" if trusted else "validated"
+                print(f"{suffix:7} {label:10} {elapsed * 1e3:10.1f} ms")
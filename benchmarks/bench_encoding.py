@@ -0,0 +1,77 @@
+"""serialising order books, orders and balances for the API
+
+OrderBook.json() against the encoders in pumpdump.encoding, and
+Platform.order_book_json for a book that changes between polls and one that
+does not
+
+run from the repository root with `python -m benchmarks.bench_encoding [levels]`
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+from pumpdump.encoding import encode
+from pumpdump.model_utils import json_dumps
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def platform_with_book(levels: int) -> Platform:
+    platform = Platform()
+    rng = random.Random(0)
+    for i in range(levels):
+        for side, price in (("buy", 10_000 - i), ("sell", 10_001 + i)):
+            for _ in range(3):
+                platform.add_order(
+                    LimitOrder(
+                        symbol="FOOBAR",
+                        size=Decimal(rng.randint(1, 10_000)) / 100,
+                        side=side,
+                        price=Decimal(price) / 100,
+                        user_id="0",
+                    )
+                )
+    return platform
+
+
+def timed(name: str, n: int, call) -> None:
+    start = time.perf_counter()
+    for _ in range(n):
+        call()
+    elapsed = time.perf_counter() - start
+    print(f"{name:36} {elapsed / n * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n = 2_000
+
+    platform = platform_with_book(levels)
+    engine = platform.trading_engine["FOOBAR"]
+    print(f"{levels} levels a side")
+
+    timed("OrderBook.json()", n, lambda: platform.order_book("FOOBAR").json())
+    timed("json_dumps(OrderBook)", n, lambda: json_dumps(platform.order_book("FOOBAR")))
+    timed("encode(OrderBook)", n, lambda: encode(platform.order_book("FOOBAR")))
+
+    def changed():
+        # forces the book to be encoded again, as after any change to it
+        engine._bids.version += 1
+        return platform.order_book_json("FOOBAR")
+
+    timed("order_book_json, book changed", n, changed)
+    timed(
+        "order_book_json, book unchanged", n, lambda: platform.order_book_json("FOOBAR")
+    )
+
+    order = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=500, side="buy", price=101, user_id="0")
+    )
+    print(f"order with {len(order.trades)} trades")
+    timed("Order.json()", n, order.json)
+    timed("encode(Order)", n, lambda: encode(order))
+
+    balance = platform.balance("0")
+    timed("Balance.json()", n, balance.json)
+    timed("encode(Balance)", n, lambda: encode(balance))
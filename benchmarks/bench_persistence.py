@@ -0,0 +1,60 @@
+"""matching throughput with and without the SQLite sink attached
+
+run from the repository root with `python -m benchmarks.bench_persistence [n]`
+"""
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from pumpdump.persistence import SqliteSink
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def orders(n: int):
+    rng = random.Random(0)
+    return [
+        LimitOrder(
+            symbol="FOOBAR",
+            size=Decimal(rng.randint(1, 100)),
+            side=rng.choice(("buy", "sell")),
+            price=Decimal(rng.randint(9900, 10100)) / 100,
+            user_id=f"user{rng.randint(0, 9)}",
+        )
+        for _ in range(n)
+    ]
+
+
+def run(n: int, sink: SqliteSink = None) -> float:
+    platform = Platform()
+    if sink is not None:
+        sink.start()
+        platform.listeners.append(sink)
+
+    batch = orders(n)
+    start = time.perf_counter()
+    for i, order in enumerate(batch):
+        platform.add_order(order)
+        if i % 10 == 0 and not order.completed:
+            platform.cancel_order(order.order_id, "FOOBAR")
+    elapsed = time.perf_counter() - start
+
+    if sink is not None:
+        sink.close()
+        print(f"  written {sink.written} events, dropped {sink.dropped}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    off = run(n)
+    print(f"sink off:          {n / off:10.0f} orders/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for policy in ("drop", "block"):
+            on = run(n, SqliteSink(Path(tmp) / f"{policy}.db", policy=policy))
+            print(f"sink on ({policy:5}):  {n / on:10.0f} orders/s")
@@ -0,0 +1,71 @@
+"""cost to fill queries: Platform.quote against walking Platform.order_book
+
+the cumulative depth behind quote is rebuilt once after each change to the
+book, so the last line is the cost when every query follows a change
+
+run from the repository root with `python -m benchmarks.bench_quote [levels]`
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+def platform_with_book(levels: int) -> Platform:
+    platform = Platform()
+    rng = random.Random(0)
+    for i in range(levels):
+        for side, price in (("buy", 10_000 - i), ("sell", 10_001 + i)):
+            platform.add_order(
+                LimitOrder(
+                    symbol="FOOBAR",
+                    size=Decimal(rng.randint(1, 10_000)) / 100,
+                    side=side,
+                    price=Decimal(price) / 100,
+                )
+            )
+    return platform
+
+
+def walk_book(platform: Platform, size: Decimal):
+    book = platform.order_book("FOOBAR")
+    remaining, notional, levels = size, Decimal(0), 0
+    for level in book.asks:
+        amount = min(remaining, level.quantity)
+        notional += amount * level.price
+        remaining -= amount
+        levels += 1
+        if remaining == 0:
+            break
+    return notional / (size - remaining), level.price, levels
+
+
+def timed(name: str, sizes, query) -> None:
+    start = time.perf_counter()
+    for size in sizes:
+        query(size)
+    elapsed = time.perf_counter() - start
+    print(f"{name:28} {elapsed / len(sizes) * 1e6:9.1f} us/query")
+
+
+if __name__ == "__main__":
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    rng = random.Random(1)
+    # up to about a quarter of the book
+    sizes = [Decimal(rng.randint(1, levels * 1250)) / 100 for _ in range(1_000)]
+
+    platform = platform_with_book(levels)
+    print(f"{levels} levels a side")
+    timed("walk order_book", sizes, lambda size: walk_book(platform, size))
+    timed("quote", sizes, lambda size: platform.quote("FOOBAR", "buy", size))
+
+    engine = platform.trading_engine["FOOBAR"]
+
+    def after_change(size):
+        engine._asks.version += 1
+        return platform.quote("FOOBAR", "buy", size)
+
+    timed("quote after a book change", sizes, after_change)
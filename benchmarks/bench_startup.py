@@ -0,0 +1,65 @@
+"""startup cost: package import, config construction and Platform construction
+
+run from the repository root with `python -m benchmarks.bench_startup [n_symbols]`
+"""
+import subprocess
+import sys
+import time
+
+IMPORTS = (
+    "pumpdump",
+    "pumpdump._config",
+    "pumpdump.platform.platform",
+)
+
+
+def bench_import(module: str, repeat: int = 5) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; "
+    code += "print(time.perf_counter() - t)"
+    timings = [
+        float(subprocess.check_output([sys.executable, "-c", code]))
+        for _ in range(repeat)
+    ]
+    return min(timings)
+
+
+def bench_platform(n_symbols: int) -> None:
+    from pumpdump._config import PlatformConfig, SymbolConfig
+    from pumpdump.platform.platform import Platform
+
+    start = time.perf_counter()
+    config = PlatformConfig(
+        symbol_configs={
+            f"SYM{i}": SymbolConfig(
+                symbol=f"SYM{i}",
+                price_tick="0.01",
+                size_tick="0.01",
+                min_size="0.01",
+                base=f"BASE{i}",
+                quote="USD",
+            )
+            for i in range(n_symbols)
+        }
+    )
+    config_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    platform = Platform(config)
+    platform_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    platform.order_book(f"SYM{n_symbols // 2}")
+    first_use_time = time.perf_counter() - start
+
+    print(f"PlatformConfig({n_symbols} symbols): {config_time * 1e3:10.3f} ms")
+    print(f"Platform(config):                {platform_time * 1e3:10.3f} ms")
+    print(f"first order_book on one symbol:  {first_use_time * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    for module in IMPORTS:
+        print(f"import {module:30} {bench_import(module) * 1e3:10.3f} ms")
+
+    bench_platform(n_symbols)
@@ -0,0 +1,98 @@
+"""matching cost with many resting stop orders
+
+trades near the market with no stops, then with 100k stops resting away from
+it, and finally a sweep that sets off a cascade of them. The last line is what
+checking every pending stop after each trade would cost instead.
+
+run from the repository root with `python -m benchmarks.bench_stops [stops]`
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+from pumpdump.platform.order import LimitOrder, StopMarketOrder
+from pumpdump.platform.trading_engine import TradingEngine
+
+
+def seed_book(engine: TradingEngine) -> None:
+    for i in range(1, 51):
+        for side, price in (("buy", 100 - i), ("sell", 100 + i)):
+            engine.add_order(
+                LimitOrder(symbol="FOOBAR", size=1000, side=side, price=price)
+            )
+
+
+def add_stops(engine: TradingEngine, n: int) -> float:
+    rng = random.Random(0)
+    stops = [
+        StopMarketOrder(
+            symbol="FOOBAR",
+            size=1,
+            side=side,
+            # buy stops in 110 - 150, sell stops in 50 - 90
+            stop_price=Decimal(rng.randint(0, 4000)) / 100
+            + (Decimal(110) if side == "buy" else Decimal(50)),
+        )
+        for side in ("buy", "sell")
+        for _ in range(n // 2)
+    ]
+    start = time.perf_counter()
+    for stop in stops:
+        engine.add_order(stop)
+    return time.perf_counter() - start
+
+
+def trade_near_market(engine: TradingEngine, n: int) -> float:
+    rng = random.Random(1)
+    orders = [
+        LimitOrder(
+            symbol="FOOBAR",
+            size=1,
+            side=side,
+            price=Decimal(101) if side == "buy" else Decimal(99),
+        )
+        for side in (rng.choice(("buy", "sell")) for _ in range(n))
+    ]
+    start = time.perf_counter()
+    for order in orders:
+        engine.add_order(order)
+    return time.perf_counter() - start
+
+
+def linear_scan(engine: TradingEngine, n: int) -> float:
+    stops = list(engine._stop_orders.values())
+    price = Decimal(100)
+    start = time.perf_counter()
+    for _ in range(n):
+        [s for s in stops if (s.side == "buy") == (s.stop_price <= price)]
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_stops = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_trades = 5_000
+
+    engine = TradingEngine("FOOBAR")
+    seed_book(engine)
+    elapsed = trade_near_market(engine, n_trades)
+    print(f"no stops:             {elapsed / n_trades * 1e6:8.1f} us/trading order")
+
+    engine = TradingEngine("FOOBAR")
+    seed_book(engine)
+    elapsed = add_stops(engine, n_stops)
+    print(f"add {n_stops} stops:     {elapsed / n_stops * 1e6:8.1f} us/stop")
+    elapsed = trade_near_market(engine, n_trades)
+    print(f"{n_stops} stops resting: {elapsed / n_trades * 1e6:8.1f} us/trading order")
+
+    # the sweep reaches 70 and triggers the sell stops above it, and their
+    # market sells walk the book down through the rest
+    before = len(engine._stop_orders)
+    start = time.perf_counter()
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=30_000, side="sell", price=70))
+    elapsed = time.perf_counter() - start
+    triggered = before - len(engine._stop_orders)
+    print(f"sweep triggering {triggered} stops: {elapsed * 1e3:8.1f} ms")
+
+    elapsed = linear_scan(engine, 100)
+    print(f"scanning every stop:  {elapsed / 100 * 1e6:8.1f} us/trading order")
@@ -1,5 +1,39 @@
 # flake8: noqa
-from pumpdump._config import PlatformConfig, SymbolConfig, default_config
-from pumpdump.actor.random_walk import RandomWalk
-from pumpdump.platform import Platform
-from pumpdump.platform.order import LimitOrder, Side
+# public names are resolved on first access so that `import pumpdump` stays cheap
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pumpdump._config import PlatformConfig, SymbolConfig, default_config
+    from pumpdump.actor.random_walk import RandomWalk
+    from pumpdump.config_loader import load_platform_config
+    from pumpdump.platform import Platform
+    from pumpdump.platform.order import LimitOrder, Side
+
+_LAZY_ATTRS = {
+    "PlatformConfig": "pumpdump._config",
+    "SymbolConfig": "pumpdump._config",
+    "default_config": "pumpdump._config",
+    "RandomWalk": "pumpdump.actor.random_walk",
+    "load_platform_config": "pumpdump.config_loader",
+    "Platform": "pumpdump.platform",
+    "LimitOrder": "pumpdump.platform.order",
+    "Side": "pumpdump.platform.order",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -54,6 +54,10 @@ def default_balance_config() -> Dict[Optional[str], InitialBalance]:
     }
 
 
+def default_candle_intervals() -> Dict[str, int]:
+    return {"1s": 1, "1m": 60, "5m": 300, "1h": 3600}
+
+
 @static_check_init_args
 class PlatformConfig(BaseModel):
     symbol_configs: Dict[str, SymbolConfig] = Field(
@@ -64,6 +68,14 @@ class PlatformConfig(BaseModel):
         default_factory=default_balance_config
     )
 
+    candle_intervals: Dict[str, int] = Field(
+        default_factory=default_candle_intervals,
+        description="candle interval name -> length in seconds",
+    )
+    max_candles: int = Field(
+        default=1000, description="closed candles kept per symbol and interval"
+    )
+
     class UndefinedSymbolConfig(Exception):
         pass
 
@@ -0,0 +1,216 @@
+"""A constant product market maker that keeps its ladder on the book.
+
+Liquidity is placed on a fixed geometric grid of prices, anchored at the
+starting price and ``step`` apart, the way a concentrated liquidity pool places
+it in ticks. Each band between two grid prices is quoted as one order for the
+base the curve ``base * quote = L ** 2`` trades between them, at their
+geometric mean price less the fee for bids and plus the fee for asks; the band
+the current price is in is split between a bid and an ask.
+
+Fills move the reserves along the curve, but a band away from the current price
+depends only on L and the grid, so each upkeep re-quotes just the bands the
+price moved across and the one it is in now, amending the orders for levels
+it still quotes rather than replacing them. Fees are kept in the quote
+reserve and not added to L.
+"""
+import math
+import random
+import threading
+import time
+from collections import Counter
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from typing import Any, Dict, Optional, Tuple, Union
+
+from pumpdump.platform.exceptions import TradingEngineException
+from pumpdump.platform.order import LimitOrder, Side
+from pumpdump.platform.platform import Platform
+from pumpdump.utils import _initial_reserves
+
+Number = Union[int, float, Decimal, str]
+# Side isn't hashable, so levels are keyed by its value
+Level = Tuple[str, Decimal]
+
+
+class ConstantProductMaker(threading.Thread):
+    def __init__(
+        self,
+        platform: Platform,
+        symbol: str,
+        starting_price: Optional[Number] = None,
+        base_reserve: Optional[Number] = None,
+        quote_reserve: Optional[Number] = None,
+        levels: int = 30,
+        step: float = 0.002,
+        fee: Number = Decimal("0.001"),
+        run_interval: float = 0.1,
+        stop_flag: Optional[threading.Event] = None,
+        seed: Any = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        """
+        starting_price, base_reserve, quote_reserve: any two, the rest are
+            random as in generate_constant_product_book
+        levels: bands quoted on each side
+        step: relative distance between grid prices
+        """
+        super().__init__(name="constant product bot", daemon=True)
+
+        self.platform = platform
+        self.symbol = symbol
+        self.levels = levels
+        self.fee = float(fee)
+        self.run_interval = run_interval
+        self.user_id = user_id
+
+        self.stop_flag = stop_flag or threading.Event()
+        self.random = random.Random()
+        self.random.seed(seed)
+        self.exception: Optional[Exception] = None
+        self.stats: Counter = Counter()
+
+        self.base_reserve, self.quote_reserve = _initial_reserves(
+            starting_price, base_reserve, quote_reserve, self.random
+        )
+        self.liquidity = math.sqrt(self.base_reserve * self.quote_reserve)
+        self.anchor = self.quote_reserve / self.base_reserve
+        self._log_ratio = math.log1p(step)
+
+        # resting orders by level, and how many of each one's trades have been
+        # applied to the reserves
+        self._resting: Dict[Level, LimitOrder] = {}
+        self._applied: Dict[str, int] = {}
+
+    def run(self):
+        try:
+            while not self.stop_flag.is_set():
+                self.upkeep()
+                time.sleep(self.run_interval)
+        except Exception as e:
+            self.exception = e
+            raise
+
+    @property
+    def price(self) -> float:
+        """price on the curve at the current base reserve"""
+        return (self.liquidity / self.base_reserve) ** 2
+
+    def _grid(self, i: int) -> float:
+        return self.anchor * math.exp(i * self._log_ratio)
+
+    def _band(self, low: float, high: float) -> Tuple[float, float]:
+        """base traded between two prices and the average price paid"""
+        size = self.liquidity * (1 / math.sqrt(low) - 1 / math.sqrt(high))
+        return size, math.sqrt(low * high)
+
+    def ladder(self) -> Dict[Level, Decimal]:
+        """target size for every level, after rounding to the symbol's ticks"""
+        symbol_config = self.platform.symbol_configs[self.symbol]
+        price = self.price
+        # grid index of the band the price is in, nudged so that a price on a
+        # grid line is not put in the band below by rounding
+        index = math.floor(math.log(price / self.anchor) / self._log_ratio + 1e-9)
+
+        # bids in the bands below the price and asks in those above, starting
+        # from the part of the current band on each side
+        bands = []
+        high, i = price, index
+        while len(bands) < self.levels:
+            low = self._grid(i)
+            if low < high:
+                bands.append((Side.buy.value, low, high, 1 - self.fee, ROUND_FLOOR))
+                high = low
+            i -= 1
+        low, i = price, index + 1
+        while len(bands) < 2 * self.levels:
+            high = self._grid(i)
+            if high > low:
+                bands.append((Side.sell.value, low, high, 1 + self.fee, ROUND_CEILING))
+                low = high
+            i += 1
+
+        target: Dict[Level, Decimal] = {}
+        for side, low, high, fee_factor, rounding in bands:
+            size, band_price = self._band(low, high)
+            level = (
+                side,
+                Decimal(band_price * fee_factor).quantize(
+                    symbol_config.price_tick, rounding=rounding
+                ),
+            )
+            # bands narrower than a tick share a price
+            target[level] = target.get(level, Decimal(0)) + Decimal(size).quantize(
+                symbol_config.size_tick, rounding=ROUND_FLOOR
+            )
+
+        return {
+            level: size
+            for level, size in target.items()
+            if size >= symbol_config.min_size
+        }
+
+    def _apply_fills(self, order: LimitOrder) -> None:
+        applied = self._applied.get(order.order_id, 0)
+        for trade in order.trades[applied:]:
+            if order.side == Side.buy:
+                self.base_reserve += float(trade.amount)
+                self.quote_reserve -= float(trade.amount * trade.price)
+            else:
+                self.base_reserve -= float(trade.amount)
+                self.quote_reserve += float(trade.amount * trade.price)
+        self._applied[order.order_id] = len(order.trades)
+
+    def _forget(self, level: Level) -> None:
+        order = self._resting.pop(level)
+        self._apply_fills(order)
+        del self._applied[order.order_id]
+
+    def _requote(
+        self, level: Level, order: LimitOrder, size: Optional[Decimal]
+    ) -> None:
+        """resize the order resting at level to size, or cancel it if size is
+        None"""
+        try:
+            if size is not None:
+                # a smaller size keeps the order's place in the queue
+                self.platform.amend_order(
+                    order.order_id, order.dealt + size, symbol=self.symbol
+                )
+                self.stats["amend"] += 1
+                return
+            self.platform.cancel_order(order.order_id, self.symbol)
+        except TradingEngineException:
+            pass  # filled in the meantime
+        self._forget(level)
+        self.stats["cancel"] += 1
+
+    def upkeep(self):
+        for level, order in list(self._resting.items()):
+            self._apply_fills(order)
+            if order.completed or order.canceled:
+                self._forget(level)
+
+        target = self.ladder()
+
+        for level, order in list(self._resting.items()):
+            size = target.get(level)
+            if size != order.remaining:
+                self._requote(level, order, size)
+
+        for (side, price), size in target.items():
+            if (side, price) in self._resting:
+                continue
+            order = self.platform.add_order(
+                LimitOrder(
+                    symbol=self.symbol,
+                    size=size,
+                    side=side,
+                    price=price,
+                    user_id=self.user_id,
+                )
+            )
+            self.stats["add"] += 1
+            self._apply_fills(order)
+            if order.completed:
+                del self._applied[order.order_id]
+            else:
+                self._resting[side, price] = order
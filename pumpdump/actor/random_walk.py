@@ -19,7 +19,13 @@ class RandomWalk(threading.Thread):
         run_interval: Union[int, float, Decimal, str] = 0.1,
         stop_flag: Optional[threading.Event] = None,
         seed: Any = None,
+        user_id: Optional[str] = None,
+        ttl: Optional[float] = None,
     ) -> None:
+        """
+        ttl: seconds each order rests before it expires, by default until
+            canceled
+        """
         super().__init__(name="random walk bot", daemon=True)
 
         self.platform = platform
@@ -28,6 +34,8 @@ class RandomWalk(threading.Thread):
         self.volume = volume
         self.variance = variance
         self.run_interval = run_interval
+        self.user_id = user_id
+        self.ttl = ttl
 
         self.stop_flag = stop_flag or threading.Event()
         self.random = random.Random()
@@ -74,5 +82,12 @@ class RandomWalk(threading.Thread):
             self.random.normalvariate(1, self.variance - 1) * reference_price
         ).quantize(exp=symbol_config.price_tick)
 
-        order = LimitOrder(symbol=self.symbol, size=size, side=side, price=price)
+        order = LimitOrder(
+            symbol=self.symbol,
+            size=size,
+            side=side,
+            price=price,
+            user_id=self.user_id,
+            ttl=self.ttl,
+        )
         self.platform.add_order(order)
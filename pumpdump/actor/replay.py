@@ -0,0 +1,273 @@
+"""Replay recorded order flow into a Platform.
+
+Records are read from memory-mapped files a chunk at a time, so the size of
+the file does not affect memory use. Two formats are understood:
+
+* ``csv`` with a header naming the columns
+  ``timestamp,action,symbol,order_id,side,price,size,user_id``
+* ``bin``: fixed-size little-endian records written by ``write_binary_records``
+
+``timestamp`` is in epoch seconds. ``action`` is ``add`` (a limit order),
+``cancel`` (of an order added earlier by the replay) or ``trade`` (an aggressive
+order on ``side`` at ``price``, with whatever does not fill canceled).
+"""
+import csv
+import mmap
+import struct
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, NamedTuple, Optional, Union
+
+from pydantic import ValidationError
+
+from pumpdump.model_utils import uuid_hex
+from pumpdump.platform.candles import EPOCH
+from pumpdump.platform.exceptions import InsufficientBalance, PlatformException
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+PathLike = Union[str, Path]
+
+CSV_COLUMNS = (
+    "timestamp",
+    "action",
+    "symbol",
+    "order_id",
+    "side",
+    "price",
+    "size",
+    "user_id",
+)
+
+ACTIONS = ("add", "cancel", "trade")
+SIDES = (None, "buy", "sell")
+
+_BINARY_MAGIC = b"PDRPL\x01"
+# timestamp, action, side, symbol, order_id, price, size, user_id
+_BINARY_RECORD = struct.Struct("<dBB16s32sdd16s")
+
+
+class ReplayRecord(NamedTuple):
+    timestamp: float
+    action: str
+    symbol: str
+    order_id: Optional[str] = None
+    side: Optional[str] = None
+    price: Optional[Decimal] = None
+    size: Optional[Decimal] = None
+    user_id: Optional[str] = None
+
+
+def _file_format(path: PathLike, fmt: Optional[str]) -> str:
+    if fmt is not None:
+        return fmt
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix == ".bin":
+        return "bin"
+    raise ValueError(f"cannot infer replay file format from {path}")
+
+
+def _mapped(path: PathLike) -> mmap.mmap:
+    with open(path, "rb") as fp:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_csv_records(
+    path: PathLike, chunk_size: int = 1 << 20
+) -> Iterator[ReplayRecord]:
+    with _mapped(path) as mm:
+        header_end = mm.find(b"\n")
+        if header_end < 0:
+            return
+        header = next(csv.reader([mm[:header_end].decode().rstrip("\r")]))
+        columns = [header.index(column) for column in CSV_COLUMNS]
+
+        position, size = header_end + 1, len(mm)
+        while position < size:
+            # cut each chunk at a line boundary; a line longer than chunk_size
+            # just makes that chunk longer
+            end = min(position + chunk_size, size)
+            if end < size:
+                newline = mm.rfind(b"\n", position, end)
+                if newline < 0:
+                    newline = mm.find(b"\n", end)
+                end = size if newline < 0 else newline + 1
+
+            for row in csv.reader(mm[position:end].decode().splitlines()):
+                if not row:
+                    continue
+                values = [row[i] or None for i in columns]
+                yield ReplayRecord(
+                    float(values[0]),
+                    values[1],
+                    values[2],
+                    values[3],
+                    values[4],
+                    Decimal(values[5]) if values[5] is not None else None,
+                    Decimal(values[6]) if values[6] is not None else None,
+                    values[7],
+                )
+            position = end
+
+
+def _text(raw: bytes) -> Optional[str]:
+    return raw.rstrip(b"\x00").decode() or None
+
+
+def iter_binary_records(
+    path: PathLike, chunk_records: int = 1 << 14
+) -> Iterator[ReplayRecord]:
+    with _mapped(path) as mm:
+        if mm[: len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+            raise ValueError("not a pumpdump replay file")
+
+        position = len(_BINARY_MAGIC)
+        chunk_bytes = chunk_records * _BINARY_RECORD.size
+        while position < len(mm):
+            chunk = mm[position : position + chunk_bytes]
+            position += chunk_bytes
+            for (
+                timestamp,
+                action,
+                side,
+                symbol,
+                order_id,
+                price,
+                size,
+                user_id,
+            ) in _BINARY_RECORD.iter_unpack(chunk):
+                yield ReplayRecord(
+                    timestamp,
+                    ACTIONS[action],
+                    _text(symbol),
+                    _text(order_id),
+                    SIDES[side],
+                    Decimal(repr(price)) if price else None,
+                    Decimal(repr(size)) if size else None,
+                    _text(user_id),
+                )
+
+
+def iter_records(path: PathLike, fmt: Optional[str] = None) -> Iterator[ReplayRecord]:
+    if _file_format(path, fmt) == "csv":
+        return iter_csv_records(path)
+    return iter_binary_records(path)
+
+
+def _fixed(value: Optional[str], width: int) -> bytes:
+    data = (value or "").encode()
+    if len(data) > width:
+        raise ValueError(f"{value!r} longer than {width} bytes")
+    return data
+
+
+def write_binary_records(path: PathLike, records: Iterable[ReplayRecord]) -> None:
+    with open(path, "wb") as fp:
+        fp.write(_BINARY_MAGIC)
+        for record in records:
+            fp.write(
+                _BINARY_RECORD.pack(
+                    record.timestamp,
+                    ACTIONS.index(record.action),
+                    SIDES.index(record.side),
+                    _fixed(record.symbol, 16),
+                    _fixed(record.order_id, 32),
+                    float(record.price or 0),
+                    float(record.size or 0),
+                    _fixed(record.user_id, 16),
+                )
+            )
+
+
+class Replay(threading.Thread):
+    def __init__(
+        self,
+        platform: Platform,
+        path: PathLike,
+        speed: Optional[float] = 1.0,
+        symbols: Optional[Collection[str]] = None,
+        original_timestamps: bool = True,
+        stop_flag: Optional[threading.Event] = None,
+        fmt: Optional[str] = None,
+    ) -> None:
+        """
+        speed: multiple of the recorded pace, None replays as fast as possible
+        symbols: only replay these symbols, by default every configured symbol
+        original_timestamps: stamp orders with their recorded time
+        """
+        super().__init__(name="replay bot", daemon=True)
+
+        self.platform = platform
+        self.path = path
+        self.speed = speed
+        self.symbols = symbols
+        self.original_timestamps = original_timestamps
+        self.fmt = fmt
+
+        self.stop_flag = stop_flag or threading.Event()
+        self.exception: Optional[Exception] = None
+        self.stats: Counter = Counter()
+
+    def run(self):
+        try:
+            self.replay()
+        except Exception as e:
+            self.exception = e
+            raise
+
+    def replay(self) -> None:
+        start_time = first_timestamp = None
+        for record in iter_records(self.path, self.fmt):
+            if self.stop_flag.is_set():
+                return
+
+            if self.speed:
+                if first_timestamp is None:
+                    start_time, first_timestamp = time.monotonic(), record.timestamp
+                due = start_time + (record.timestamp - first_timestamp) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0 and self.stop_flag.wait(delay):
+                    return
+
+            self.apply(record)
+
+    def apply(self, record: ReplayRecord) -> None:
+        if record.symbol not in self.platform.trading_engine or (
+            self.symbols is not None and record.symbol not in self.symbols
+        ):
+            self.stats["skipped"] += 1
+            return
+
+        try:
+            if record.action == "cancel":
+                self.platform.cancel_order(record.order_id, record.symbol)
+            else:
+                order = self.platform.add_order(self._order(record))
+                if record.action == "trade" and not order.completed:
+                    self.platform.cancel_order(order.order_id, record.symbol)
+        except (PlatformException, InsufficientBalance, ValidationError):
+            self.stats["rejected"] += 1
+        else:
+            self.stats[record.action] += 1
+
+    def _order(self, record: ReplayRecord) -> LimitOrder:
+        # without original timestamps the platform stamps orders from its clock
+        times = {}
+        if self.original_timestamps:
+            times["create_time"] = EPOCH + timedelta(seconds=record.timestamp)
+
+        return LimitOrder(
+            symbol=record.symbol,
+            size=record.size,
+            side=record.side,
+            price=record.price,
+            order_id=record.order_id or uuid_hex(),
+            user_id=record.user_id,
+            **times,
+        )
@@ -0,0 +1,434 @@
+"""Client for the HTTP API served by pumpdump.main
+
+    with PlatformClient("http://127.0.0.1:8000") as client:
+        order = client.add_order(LimitOrder(...))
+        book = client.order_book("FOOBAR", depth=10)
+
+    async with AsyncPlatformClient("http://127.0.0.1:8000") as client:
+        async with client.market_data() as market_data:
+            await market_data.subscribe("FOOBAR", depth=10)
+            async for book in market_data:
+                ...
+
+The methods mirror those of Platform and raise the same exceptions. Connections
+are kept alive and reused from a pool. add_orders submits orders in batches of
+``batch_size`` per request, and AsyncPlatformClient sends the batches
+concurrently over the pool. Market data needs the websockets package.
+"""
+import asyncio
+import json
+import socket
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import httpx
+
+from pumpdump.encoding import encode
+from pumpdump.platform import exceptions
+from pumpdump.platform.balance import Balance
+from pumpdump.platform.order import Order, Side, parse_order
+from pumpdump.platform.order_book import OrderBook, Quote
+
+DEFAULT_URL = "http://127.0.0.1:8000"
+
+_HEADERS = {"content-type": "application/json"}
+
+
+class ApiError(Exception):
+    """an error response that is not one of the platform exceptions"""
+
+    def __init__(self, status_code: Optional[int], detail: Any) -> None:
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _exception(body: Any, status_code: Optional[int]) -> Exception:
+    name = body.get("error") if isinstance(body, dict) else None
+    exception_class = getattr(exceptions, name, None) if name else None
+    if isinstance(exception_class, type) and issubclass(exception_class, Exception):
+        return exception_class(body.get("detail"))
+    return ApiError(status_code, body)
+
+
+def _body(response: httpx.Response) -> Any:
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    if response.is_error:
+        raise _exception(body, response.status_code)
+    return body
+
+
+def _params(**params) -> Dict[str, Any]:
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _batch_results(body: List[dict]) -> List[Union[Order, Exception]]:
+    return [
+        parse_order(result["order"]) if "order" in result else _exception(result, None)
+        for result in body
+    ]
+
+
+def _book(message: Union[str, bytes]) -> OrderBook:
+    data = json.loads(message)
+    if "error" in data:
+        raise _exception(data, None)
+    return OrderBook.parse_obj(data)
+
+
+def _ws_url(base_url: str) -> str:
+    if base_url.startswith("http"):
+        base_url = "ws" + base_url[len("http") :]
+    return base_url.rstrip("/") + "/ws"
+
+
+# requests are small and latency bound, so don't let Nagle hold them back
+_SOCKET_OPTIONS = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+
+
+def _transport_options(max_connections: int) -> Dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        "socket_options": _SOCKET_OPTIONS,
+    }
+
+
+class PlatformClient:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        batch_size: int = 500,
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        http: Optional[httpx.Client] = None,
+    ) -> None:
+        """
+        batch_size: orders per request in add_orders
+        http: client to send requests with, instead of a new pooled one
+        """
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.http = http or httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            transport=httpx.HTTPTransport(**_transport_options(max_connections)),
+        )
+
+    def __enter__(self) -> "PlatformClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.http.close()
+
+    def _request(self, method: str, url: str, **kwargs) -> Any:
+        return _body(self.http.request(method, url, **kwargs))
+
+    def add_order(self, order: Order) -> Order:
+        return parse_order(
+            self._request("POST", "/orders", content=encode(order), headers=_HEADERS)
+        )
+
+    def add_orders(self, orders: Iterable[Order]) -> List[Union[Order, Exception]]:
+        """add many orders with one request per batch_size orders
+
+        returns the added order, or the exception it was rejected with, for
+        each order in turn
+        """
+        orders = list(orders)
+        results: List[Union[Order, Exception]] = []
+        for i in range(0, len(orders), self.batch_size):
+            body = self._request(
+                "POST",
+                "/orders/batch",
+                content=encode(orders[i : i + self.batch_size]),
+                headers=_HEADERS,
+            )
+            results.extend(_batch_results(body))
+        return results
+
+    def order_status(self, order_id: str, symbol: Optional[str] = None) -> Order:
+        return parse_order(
+            self._request("GET", f"/orders/{order_id}", params=_params(symbol=symbol))
+        )
+
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> Order:
+        return parse_order(
+            self._request(
+                "DELETE", f"/orders/{order_id}", params=_params(symbol=symbol)
+            )
+        )
+
+    def amend_order(
+        self,
+        order_id: str,
+        new_size: Optional[Decimal] = None,
+        new_price: Optional[Decimal] = None,
+        symbol: Optional[str] = None,
+    ) -> Order:
+        return parse_order(
+            self._request(
+                "PATCH",
+                f"/orders/{order_id}",
+                params=_params(symbol=symbol),
+                content=encode(_params(size=new_size, price=new_price)),
+                headers=_HEADERS,
+            )
+        )
+
+    def order_book(self, symbol: str, depth: Optional[int] = None) -> OrderBook:
+        return OrderBook.parse_obj(
+            self._request("GET", f"/order_book/{symbol}", params=_params(depth=depth))
+        )
+
+    def quote(self, symbol: str, side: str, size: Decimal) -> Quote:
+        return Quote.parse_obj(
+            self._request(
+                "GET",
+                f"/quote/{symbol}",
+                params={"side": Side(side).value, "size": size},
+            )
+        )
+
+    def size_for_price(self, symbol: str, side: str, limit_price: Decimal) -> Quote:
+        return Quote.parse_obj(
+            self._request(
+                "GET",
+                f"/size_for_price/{symbol}",
+                params={"side": Side(side).value, "limit_price": limit_price},
+            )
+        )
+
+    def balance(self, user_id: str) -> Balance:
+        return Balance.parse_obj(self._request("GET", f"/balance/{user_id}"))
+
+    def market_data(self) -> "MarketData":
+        return MarketData(_ws_url(self.base_url))
+
+
+class AsyncPlatformClient:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        batch_size: int = 500,
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        http: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        """
+        batch_size: orders per request in add_orders
+        http: client to send requests with, instead of a new pooled one
+        """
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.http = http or httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(**_transport_options(max_connections)),
+        )
+
+    async def __aenter__(self) -> "AsyncPlatformClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        return _body(await self.http.request(method, url, **kwargs))
+
+    async def add_order(self, order: Order) -> Order:
+        return parse_order(
+            await self._request(
+                "POST", "/orders", content=encode(order), headers=_HEADERS
+            )
+        )
+
+    async def add_orders(
+        self, orders: Iterable[Order]
+    ) -> List[Union[Order, Exception]]:
+        """add many orders, sending batches of batch_size concurrently
+
+        returns the added order, or the exception it was rejected with, for
+        each order in turn. Orders within a batch are added in order, but
+        batches may reach the platform in any order.
+        """
+        orders = list(orders)
+        bodies = await asyncio.gather(
+            *(
+                self._request(
+                    "POST",
+                    "/orders/batch",
+                    content=encode(orders[i : i + self.batch_size]),
+                    headers=_HEADERS,
+                )
+                for i in range(0, len(orders), self.batch_size)
+            )
+        )
+        return [result for body in bodies for result in _batch_results(body)]
+
+    async def order_status(self, order_id: str, symbol: Optional[str] = None) -> Order:
+        return parse_order(
+            await self._request(
+                "GET", f"/orders/{order_id}", params=_params(symbol=symbol)
+            )
+        )
+
+    async def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> Order:
+        return parse_order(
+            await self._request(
+                "DELETE", f"/orders/{order_id}", params=_params(symbol=symbol)
+            )
+        )
+
+    async def amend_order(
+        self,
+        order_id: str,
+        new_size: Optional[Decimal] = None,
+        new_price: Optional[Decimal] = None,
+        symbol: Optional[str] = None,
+    ) -> Order:
+        return parse_order(
+            await self._request(
+                "PATCH",
+                f"/orders/{order_id}",
+                params=_params(symbol=symbol),
+                content=encode(_params(size=new_size, price=new_price)),
+                headers=_HEADERS,
+            )
+        )
+
+    async def order_book(self, symbol: str, depth: Optional[int] = None) -> OrderBook:
+        return OrderBook.parse_obj(
+            await self._request(
+                "GET", f"/order_book/{symbol}", params=_params(depth=depth)
+            )
+        )
+
+    async def quote(self, symbol: str, side: str, size: Decimal) -> Quote:
+        return Quote.parse_obj(
+            await self._request(
+                "GET",
+                f"/quote/{symbol}",
+                params={"side": Side(side).value, "size": size},
+            )
+        )
+
+    async def size_for_price(
+        self, symbol: str, side: str, limit_price: Decimal
+    ) -> Quote:
+        return Quote.parse_obj(
+            await self._request(
+                "GET",
+                f"/size_for_price/{symbol}",
+                params={"side": Side(side).value, "limit_price": limit_price},
+            )
+        )
+
+    async def balance(self, user_id: str) -> Balance:
+        return Balance.parse_obj(await self._request("GET", f"/balance/{user_id}"))
+
+    def market_data(self) -> "AsyncMarketData":
+        return AsyncMarketData(_ws_url(self.base_url))
+
+
+def _subscribe(symbol: str, depth: Optional[int]) -> str:
+    return json.dumps({"subscribe": symbol, "depth": depth})
+
+
+def _unsubscribe(symbol: str) -> str:
+    return json.dumps({"unsubscribe": symbol})
+
+
+class MarketData:
+    """one WebSocket carrying order books for any number of symbols
+
+    the current book is sent on subscribing and again whenever it changes
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.connection = None
+
+    def connect(self) -> "MarketData":
+        from websockets.sync.client import connect
+
+        self.connection = connect(self.url)
+        return self
+
+    def __enter__(self) -> "MarketData":
+        return self.connect()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+
+    def subscribe(self, symbol: str, depth: Optional[int] = None) -> None:
+        self.connection.send(_subscribe(symbol, depth))
+
+    def unsubscribe(self, symbol: str) -> None:
+        self.connection.send(_unsubscribe(symbol))
+
+    def recv(self, timeout: Optional[float] = None) -> OrderBook:
+        return _book(self.connection.recv(timeout))
+
+    def __iter__(self) -> Iterator[OrderBook]:
+        for message in self.connection:
+            yield _book(message)
+
+
+class AsyncMarketData:
+    """asyncio version of MarketData"""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.connection = None
+
+    async def connect(self) -> "AsyncMarketData":
+        import websockets
+
+        self.connection = await websockets.connect(self.url)
+        return self
+
+    async def __aenter__(self) -> "AsyncMarketData":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.connection is not None:
+            await self.connection.close()
+
+    async def subscribe(self, symbol: str, depth: Optional[int] = None) -> None:
+        await self.connection.send(_subscribe(symbol, depth))
+
+    async def unsubscribe(self, symbol: str) -> None:
+        await self.connection.send(_unsubscribe(symbol))
+
+    async def recv(self) -> OrderBook:
+        return _book(await self.connection.recv())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> OrderBook:
+        import websockets
+
+        try:
+            return await self.recv()
+        except websockets.ConnectionClosedOK:
+            raise StopAsyncIteration
@@ -0,0 +1,421 @@
+"""Stream symbol and balance configuration from files into a PlatformConfig.
+
+Supported formats, picked from the file suffix unless ``fmt`` is given:
+
+* ``csv``: symbols use the SymbolConfig field names as header; balances are
+  one ``user_id,asset,amount`` row per asset (empty user_id is the default
+  balance)
+* ``jsonl``: one JSON object per line, in the shape of SymbolConfig /
+  InitialBalance
+* ``bin``: the compact length-prefixed format written by
+  ``write_symbol_configs`` / ``write_initial_balances``
+
+Files are read one record at a time. With ``trusted=True`` records are built
+with ``construct`` and skip pydantic validation entirely; otherwise each record
+is validated once and the resulting PlatformConfig is assembled without
+validating the collections a second time.
+"""
+import contextlib
+import csv
+import gc
+import io
+import itertools
+import json
+import struct
+from decimal import Decimal
+from pathlib import Path
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel, ValidationError
+
+from pumpdump._config import (
+    InitialBalance,
+    PlatformConfig,
+    SymbolConfig,
+    default_balance_config,
+    default_symbol_config,
+)
+
+PathLike = Union[str, Path]
+M = TypeVar("M", bound=BaseModel)
+
+SYMBOL_FIELDS = (
+    "symbol",
+    "price_tick",
+    "size_tick",
+    "min_size",
+    "base",
+    "quote",
+    "initial_book",
+)
+_DECIMAL_FIELDS = ("price_tick", "size_tick", "min_size", "initial_book")
+_OPTIONAL_FIELDS = ("base", "quote", "initial_book")
+
+_SYMBOLS_MAGIC = b"PDSYM\x01"
+_BALANCES_MAGIC = b"PDBAL\x01"
+_RECORD = struct.Struct("<I")
+_LENGTH = struct.Struct("<H")
+_NULL_LENGTH = 0xFFFF
+
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".bin": "bin",
+}
+
+
+class ConfigFileError(Exception):
+    def __init__(self, path: PathLike, record: int, reason: object) -> None:
+        super().__init__(f"{path}: record {record}: {reason}")
+        self.path = path
+        self.record = record
+        self.reason = reason
+
+
+def _file_format(path: PathLike, fmt: Optional[str]) -> str:
+    if fmt is not None:
+        return fmt
+    try:
+        return _SUFFIX_FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ValueError(f"cannot infer config file format from {path}")
+
+
+def _construct(model: Type[M], defaults: Dict[str, object], values: dict) -> M:
+    # like BaseModel.construct, minus its per-field default copying, which
+    # dominates when loading 100k records; defaults here are all immutable
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", {**defaults, **values})
+    object.__setattr__(instance, "__fields_set__", set(values))
+    return instance
+
+
+_SYMBOL_DEFAULTS = {
+    name: field.default
+    for name, field in SymbolConfig.__fields__.items()
+    if not field.required
+}
+
+
+def _symbol_config(values: Dict[str, object], trusted: bool) -> SymbolConfig:
+    if not trusted:
+        return SymbolConfig(**values)
+
+    for field in _DECIMAL_FIELDS:
+        value = values.get(field)
+        if value is not None and not isinstance(value, Decimal):
+            values[field] = Decimal(value)
+    return _construct(SymbolConfig, _SYMBOL_DEFAULTS, values)
+
+
+def _initial_balance(
+    user_id: Optional[str], balances: Dict[str, object], trusted: bool
+) -> InitialBalance:
+    if not trusted:
+        return InitialBalance(user_id=user_id, balances=balances)
+
+    return _construct(
+        InitialBalance,
+        {},
+        {
+            "user_id": user_id,
+            "balances": {asset: Decimal(amount) for asset, amount in balances.items()},
+        },
+    )
+
+
+# readers yield raw records; validation/construction happens in the iter_* funcs
+
+
+def _read_symbols_csv(fp: IO[str]) -> Iterator[Dict[str, object]]:
+    for row in csv.DictReader(fp):
+        for field in _OPTIONAL_FIELDS:
+            if row.get(field) == "":
+                row[field] = None
+        yield row
+
+
+def _read_jsonl(fp: IO[str]) -> Iterator[Dict[str, object]]:
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line, parse_float=Decimal)
+
+
+def _pack_strings(values: Iterable[Optional[object]]) -> bytes:
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append(_LENGTH.pack(_NULL_LENGTH))
+            continue
+        data = str(value).encode()
+        if len(data) >= _NULL_LENGTH:
+            raise ValueError(f"value too long for binary config: {value!r}")
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+
+    payload = b"".join(parts)
+    return _RECORD.pack(len(payload)) + payload
+
+
+def _unpack_strings(payload: bytes) -> List[Optional[str]]:
+    values: List[Optional[str]] = []
+    offset, end = 0, len(payload)
+    while offset < end:
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size
+        if length == _NULL_LENGTH:
+            values.append(None)
+        else:
+            values.append(payload[offset : offset + length].decode())
+            offset += length
+    return values
+
+
+def _read_records(fp: IO[bytes], magic: bytes) -> Iterator[List[Optional[str]]]:
+    # each record is a uint32 payload length followed by length-prefixed strings,
+    # so a record costs one read call however many fields it has
+    if fp.read(len(magic)) != magic:
+        raise ValueError("not a pumpdump binary config file")
+
+    while True:
+        header = fp.read(_RECORD.size)
+        if not header:
+            return
+        (length,) = _RECORD.unpack(header)
+        yield _unpack_strings(fp.read(length))
+
+
+def _json_line(values: Mapping[str, object]) -> str:
+    # Decimals are written as strings so they round-trip exactly
+    return json.dumps(values, default=str) + "\n"
+
+
+def _read_symbols_bin(fp: IO[bytes]) -> Iterator[Dict[str, object]]:
+    for values in _read_records(fp, _SYMBOLS_MAGIC):
+        yield dict(zip(SYMBOL_FIELDS, values))
+
+
+def _read_balances_csv(
+    fp: IO[str],
+) -> Iterator[Tuple[Optional[str], Dict[str, object]]]:
+    # rows for one user are expected to be contiguous; a user seen again later
+    # is merged by the caller
+    user_id = balances = None
+    for row in csv.DictReader(fp):
+        row_user = row["user_id"] or None
+        if balances is not None and row_user != user_id:
+            yield user_id, balances
+            balances = None
+        if balances is None:
+            user_id, balances = row_user, {}
+        balances[row["asset"]] = row["amount"]
+
+    if balances is not None:
+        yield user_id, balances
+
+
+def _read_balances_jsonl(
+    fp: IO[str],
+) -> Iterator[Tuple[Optional[str], Dict[str, object]]]:
+    for record in _read_jsonl(fp):
+        yield record.get("user_id"), record.get("balances", {})
+
+
+def _read_balances_bin(
+    fp: IO[bytes],
+) -> Iterator[Tuple[Optional[str], Dict[str, object]]]:
+    # user_id followed by alternating asset, amount
+    for values in _read_records(fp, _BALANCES_MAGIC):
+        yield values[0], dict(zip(values[1::2], values[2::2]))
+
+
+def _open(path: PathLike, fmt: str) -> IO:
+    if fmt == "bin":
+        return open(path, "rb", buffering=io.DEFAULT_BUFFER_SIZE * 16)
+    return open(path, "r", newline="", encoding="utf-8")
+
+
+def iter_symbol_configs(
+    path: PathLike, *, trusted: bool = False, fmt: Optional[str] = None
+) -> Iterator[SymbolConfig]:
+    fmt = _file_format(path, fmt)
+    reader: Callable[[IO], Iterator[Dict[str, object]]] = {
+        "csv": _read_symbols_csv,
+        "jsonl": _read_jsonl,
+        "bin": _read_symbols_bin,
+    }[fmt]
+
+    with _open(path, fmt) as fp:
+        for record, values in enumerate(reader(fp), start=1):
+            try:
+                yield _symbol_config(values, trusted)
+            except (ValidationError, ArithmeticError, TypeError) as e:
+                raise ConfigFileError(path, record, e) from e
+
+
+def iter_initial_balances(
+    path: PathLike, *, trusted: bool = False, fmt: Optional[str] = None
+) -> Iterator[InitialBalance]:
+    fmt = _file_format(path, fmt)
+    reader = {
+        "csv": _read_balances_csv,
+        "jsonl": _read_balances_jsonl,
+        "bin": _read_balances_bin,
+    }[fmt]
+
+    with _open(path, fmt) as fp:
+        for record, (user_id, balances) in enumerate(reader(fp), start=1):
+            try:
+                yield _initial_balance(user_id, balances, trusted)
+            except (ValidationError, ArithmeticError, TypeError) as e:
+                raise ConfigFileError(path, record, e) from e
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    # the loaders only allocate acyclic objects, so generational collections
+    # triggered by hundreds of thousands of allocations are pure overhead
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_symbol_configs(
+    path: PathLike, *, trusted: bool = False, fmt: Optional[str] = None
+) -> Dict[str, SymbolConfig]:
+    symbol_configs: Dict[str, SymbolConfig] = {}
+    for record, symbol_config in enumerate(
+        iter_symbol_configs(path, trusted=trusted, fmt=fmt), start=1
+    ):
+        if symbol_config.symbol in symbol_configs:
+            raise ConfigFileError(
+                path, record, f"duplicate symbol {symbol_config.symbol}"
+            )
+        symbol_configs[symbol_config.symbol] = symbol_config
+    return symbol_configs
+
+
+def load_balance_config(
+    path: PathLike, *, trusted: bool = False, fmt: Optional[str] = None
+) -> Dict[Optional[str], InitialBalance]:
+    balance_config: Dict[Optional[str], InitialBalance] = {}
+    for initial_balance in iter_initial_balances(path, trusted=trusted, fmt=fmt):
+        existing = balance_config.get(initial_balance.user_id)
+        if existing is not None:
+            existing.balances.update(initial_balance.balances)
+        else:
+            balance_config[initial_balance.user_id] = initial_balance
+
+    # Platform falls back to the None entry for users it hasn't seen
+    balance_config.setdefault(None, InitialBalance.construct(user_id=None, balances={}))
+    return balance_config
+
+
+def load_platform_config(
+    symbols: Optional[PathLike] = None,
+    balances: Optional[PathLike] = None,
+    *,
+    trusted: bool = False,
+) -> PlatformConfig:
+    """build a PlatformConfig from symbol and/or balance files
+
+    whichever file is omitted falls back to the same default as PlatformConfig()
+    """
+    with _gc_paused():
+        symbol_configs = (
+            load_symbol_configs(symbols, trusted=trusted)
+            if symbols is not None
+            else default_symbol_config()
+        )
+        balance_config = (
+            load_balance_config(balances, trusted=trusted)
+            if balances is not None
+            else default_balance_config()
+        )
+
+    # the entries are already SymbolConfig/InitialBalance instances, validating
+    # the containers again would copy every one of them
+    return PlatformConfig.construct(
+        symbol_configs=symbol_configs, balance_config=balance_config
+    )
+
+
+def write_symbol_configs(
+    path: PathLike, symbol_configs: Iterable[SymbolConfig], fmt: Optional[str] = None
+) -> None:
+    fmt = _file_format(path, fmt)
+    if fmt == "bin":
+        with open(path, "wb") as fp:
+            fp.write(_SYMBOLS_MAGIC)
+            for symbol_config in symbol_configs:
+                fp.write(
+                    _pack_strings(getattr(symbol_config, f) for f in SYMBOL_FIELDS)
+                )
+        return
+
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        if fmt == "csv":
+            writer = csv.writer(fp)
+            writer.writerow(SYMBOL_FIELDS)
+            for symbol_config in symbol_configs:
+                writer.writerow(
+                    "" if v is None else v
+                    for v in (getattr(symbol_config, f) for f in SYMBOL_FIELDS)
+                )
+        else:
+            for symbol_config in symbol_configs:
+                fp.write(_json_line(symbol_config.dict()))
+
+
+def write_initial_balances(
+    path: PathLike,
+    initial_balances: Iterable[InitialBalance],
+    fmt: Optional[str] = None,
+) -> None:
+    fmt = _file_format(path, fmt)
+    if fmt == "bin":
+        with open(path, "wb") as fp:
+            fp.write(_BALANCES_MAGIC)
+            for initial_balance in initial_balances:
+                fp.write(
+                    _pack_strings(
+                        [
+                            initial_balance.user_id,
+                            *itertools.chain.from_iterable(
+                                initial_balance.balances.items()
+                            ),
+                        ]
+                    )
+                )
+        return
+
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        if fmt == "csv":
+            writer = csv.writer(fp)
+            writer.writerow(("user_id", "asset", "amount"))
+            for initial_balance in initial_balances:
+                user_id = initial_balance.user_id or ""
+                for asset, amount in initial_balance.balances.items():
+                    writer.writerow((user_id, asset, amount))
+        else:
+            for initial_balance in initial_balances:
+                fp.write(_json_line(initial_balance.dict()))
@@ -0,0 +1,154 @@
+"""Compact JSON bytes for models and engine state
+
+    encode(order) == json_dumps(order).encode()
+
+gives the same output as model_utils.json_dumps, Decimals as strings, without
+going through BaseModel.dict() and the json module's default hook for every
+value. Each model class gets an encoder the first time one is seen, with its
+field names already encoded, and values are encoded by a lookup on their type.
+Order books are encoded straight from the engine's price levels by
+encode_book.
+"""
+import enum
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii as _encode_str
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+_Encoder = Callable[[Any], str]
+
+
+def _encode_decimal(value: Decimal) -> str:
+    return '"%s"' % value
+
+
+def _encode_isoformat(value) -> str:
+    return '"%s"' % value.isoformat()
+
+
+def _encode_timedelta(value: timedelta) -> str:
+    return repr(value.total_seconds())
+
+
+def _encode_list(value) -> str:
+    return "[" + ",".join([_encode(item) for item in value]) + "]"
+
+
+def _encode_dict(value) -> str:
+    return (
+        "{"
+        + ",".join([_encode_key(k) + ":" + _encode(v) for k, v in value.items()])
+        + "}"
+    )
+
+
+def _encode_key(key: Any) -> str:
+    if isinstance(key, enum.Enum):
+        key = key.value
+    return _encode_str(key if isinstance(key, str) else str(key))
+
+
+def _encode_enum(value: enum.Enum) -> str:
+    return _encode(value.value)
+
+
+def _encode_other(value: Any) -> str:
+    return _encode(pydantic_encoder(value))
+
+
+_ENCODERS: Dict[type, _Encoder] = {
+    str: _encode_str,
+    int: int.__repr__,
+    float: float.__repr__,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+    Decimal: _encode_decimal,
+    datetime: _encode_isoformat,
+    date: _encode_isoformat,
+    time: _encode_isoformat,
+    timedelta: _encode_timedelta,
+    list: _encode_list,
+    tuple: _encode_list,
+    dict: _encode_dict,
+}
+
+
+def _model_encoder(cls) -> _Encoder:
+    if "__root__" in cls.__fields__:
+        return lambda value: _encode(value.__root__)
+
+    names = list(cls.__fields__)
+    if not names:
+        return lambda value: "{}"
+    prefixes = ["{" + _encode_str(names[0]) + ":"]
+    prefixes.extend("," + _encode_str(name) + ":" for name in names[1:])
+    fields = list(zip(prefixes, names))
+
+    def encode_model(value: BaseModel) -> str:
+        values = value.__dict__
+        return (
+            "".join([prefix + _encode(values[name]) for prefix, name in fields]) + "}"
+        )
+
+    return encode_model
+
+
+def _encoder_for(cls: type) -> _Encoder:
+    # subclasses of the types above, looked up once and remembered
+    if issubclass(cls, enum.Enum):
+        encoder = _encode_enum
+    elif issubclass(cls, BaseModel):
+        encoder = _model_encoder(cls)
+    elif issubclass(cls, dict):
+        encoder = _encode_dict
+    elif issubclass(cls, (list, tuple, set, frozenset)):
+        encoder = _encode_list
+    else:
+        encoder = next(
+            (_ENCODERS[base] for base in cls.__mro__ if base in _ENCODERS),
+            _encode_other,
+        )
+    _ENCODERS[cls] = encoder
+    return encoder
+
+
+def _encode(value: Any) -> str:
+    cls = type(value)
+    encoder = _ENCODERS.get(cls)
+    if encoder is None:
+        encoder = _encoder_for(cls)
+    return encoder(value)
+
+
+def encode(value: Any) -> bytes:
+    """compact JSON for models, and lists and dicts of them"""
+    return _encode(value).encode()
+
+
+def encode_levels(levels: Iterable[Tuple[Decimal, Decimal]]) -> str:
+    return (
+        "["
+        + ",".join(['{"price":"%s","quantity":"%s"}' % level for level in levels])
+        + "]"
+    )
+
+
+def encode_book(
+    symbol: str,
+    bids: Iterable[Tuple[Decimal, Decimal]],
+    asks: Iterable[Tuple[Decimal, Decimal]],
+    timestamp: Optional[datetime] = None,
+) -> bytes:
+    """an OrderBook from (price, quantity) pairs, best first"""
+    return (
+        '{"symbol":%s,"bids":%s,"asks":%s,"timestamp":"%s"}'
+        % (
+            _encode_str(symbol),
+            encode_levels(bids),
+            encode_levels(asks),
+            (timestamp or datetime.utcnow()).isoformat(),
+        )
+    ).encode()
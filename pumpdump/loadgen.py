@@ -0,0 +1,491 @@
+"""End-to-end load generator: many actors against one Platform.
+
+A scenario file (JSON) describes the symbol/user universe, the actor mix and
+when to stop::
+
+    {
+        "name": "mixed",
+        "symbols": 10,
+        "users": 100,
+        "duration": 30,
+        "actors": [
+            {"type": "random_walk", "count": 20, "params": {"run_interval": 0}},
+            {"type": "quoter", "count": 10},
+            {"type": "book_poller", "count": 5, "params": {"run_interval": 0.05}}
+        ]
+    }
+
+run with ``python -m pumpdump.loadgen scenario.json [--json report.json]``
+"""
+import abc
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from pumpdump._config import InitialBalance, PlatformConfig, SymbolConfig
+from pumpdump.actor.constant_product import ConstantProductMaker
+from pumpdump.actor.random_walk import RandomWalk
+from pumpdump.model_utils import static_check_init_args
+from pumpdump.platform.exceptions import TradingEngineException
+from pumpdump.platform.order import LimitOrder, Side
+from pumpdump.platform.platform import Platform
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+INSTRUMENTED_OPERATIONS = ("add_order", "amend_order", "cancel_order", "order_book")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+@static_check_init_args
+class ActorSpec(BaseModel):
+    type: str
+    count: int = 1
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+@static_check_init_args
+class Scenario(BaseModel):
+    name: str = "scenario"
+    symbols: int = 1
+    users: int = Field(
+        default=1,
+        description="each trading actor trades as one of these users, so no "
+        "more users trade than there are trading actors",
+    )
+    duration: Optional[float] = Field(default=10, description="seconds")
+    operations: Optional[int] = Field(
+        default=None, description="stop after this many instrumented calls"
+    )
+    seed: Optional[int] = None
+    initial_price: float = 100
+    actors: List[ActorSpec] = Field(default_factory=list)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Scenario":
+        with open(path) as fp:
+            return cls.parse_obj(json.load(fp))
+
+    def platform_config(self) -> PlatformConfig:
+        symbol_configs = {
+            f"SYM{i}": SymbolConfig(
+                symbol=f"SYM{i}",
+                price_tick="0.01",
+                size_tick="0.01",
+                min_size="0.01",
+                base=f"BASE{i}",
+                quote="USD",
+            )
+            for i in range(self.symbols)
+        }
+        plenty = Decimal(10) ** 15
+        balances = {config.base: plenty for config in symbol_configs.values()}
+        balances["USD"] = plenty
+        return PlatformConfig(
+            symbol_configs=symbol_configs,
+            balance_config={None: InitialBalance(user_id=None, balances=balances)},
+        )
+
+
+class LatencyHistogram:
+    """log-bucketed latencies, constant memory however long the run"""
+
+    GROWTH = 1.05
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        bucket = int(math.log(max(seconds, 1e-9) * 1e9) / self._LOG_GROWTH)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        if not self.total:
+            return 0.0
+        rank = math.ceil(self.total * p / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                # upper edge of the bucket, in seconds
+                return min(self.GROWTH ** (bucket + 1) / 1e9, self.max)
+        return self.max
+
+
+class InstrumentedLock:
+    """wraps Platform.lock to measure how often and how long callers wait"""
+
+    def __init__(self, lock) -> None:
+        self._lock = lock
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_time = 0.0
+
+    def __enter__(self):
+        if self._lock.acquire(blocking=False):
+            self.acquisitions += 1
+            return self
+        start = time.perf_counter()
+        self._lock.acquire()
+        # the counters are only ever updated while holding the lock
+        self.wait_time += time.perf_counter() - start
+        self.acquisitions += 1
+        self.contended += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+
+class InstrumentedPlatform:
+    """Platform proxy timing the calls actors make"""
+
+    def __init__(self, platform: Platform) -> None:
+        self._platform = platform
+        self._local = threading.local()
+        self._histograms: List[Dict[str, LatencyHistogram]] = []
+        self._histograms_lock = threading.Lock()
+
+        for name in INSTRUMENTED_OPERATIONS:
+            setattr(self, name, self._timed(name, getattr(platform, name)))
+
+    def __getattr__(self, name):
+        return getattr(self._platform, name)
+
+    def _thread_histograms(self) -> Dict[str, LatencyHistogram]:
+        try:
+            return self._local.histograms
+        except AttributeError:
+            histograms = {name: LatencyHistogram() for name in INSTRUMENTED_OPERATIONS}
+            self._local.histograms = histograms
+            with self._histograms_lock:
+                self._histograms.append(histograms)
+            return histograms
+
+    def _timed(self, name: str, method: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            histogram = self._thread_histograms()[name]
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter() - start)
+
+        return timed
+
+    @property
+    def operations(self) -> int:
+        # read without locking: approximate while actors are running
+        return sum(h.total for hs in list(self._histograms) for h in hs.values())
+
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        merged = {name: LatencyHistogram() for name in INSTRUMENTED_OPERATIONS}
+        with self._histograms_lock:
+            for histograms in self._histograms:
+                for name, histogram in histograms.items():
+                    merged[name].merge(histogram)
+        return merged
+
+
+class _LoopActor(threading.Thread, abc.ABC):
+    def __init__(
+        self,
+        platform: Platform,
+        symbol: str,
+        run_interval: float = 0.01,
+        stop_flag: Optional[threading.Event] = None,
+        seed: Any = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        super().__init__(name=f"{type(self).__name__} bot", daemon=True)
+
+        self.platform = platform
+        self.symbol = symbol
+        self.run_interval = run_interval
+        self.user_id = user_id
+
+        self.stop_flag = stop_flag or threading.Event()
+        self.random = random.Random()
+        self.random.seed(seed)
+        self.exception: Optional[Exception] = None
+
+    def run(self):
+        try:
+            while not self.stop_flag.is_set():
+                self.upkeep()
+                time.sleep(self.run_interval)
+        except Exception as e:
+            self.exception = e
+            raise
+
+    @abc.abstractmethod
+    def upkeep(self):
+        pass
+
+
+class BookPoller(_LoopActor):
+    def upkeep(self):
+        self.platform.order_book(self.symbol)
+
+
+class Quoter(_LoopActor):
+    """rests orders around the touch and cancels the oldest beyond max_open"""
+
+    def __init__(self, *args, max_open: int = 20, spread: float = 0.01, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_open = max_open
+        self.spread = spread
+        self.open_orders: List[str] = []
+
+    def upkeep(self):
+        symbol_config = self.platform.symbol_configs[self.symbol]
+        ob = self.platform.order_book(self.symbol)
+        if ob.bids and ob.asks:
+            mid = float(ob.bids[0].price + ob.asks[0].price) / 2
+        else:
+            mid = 100.0
+
+        side = self.random.choice((Side.buy, Side.sell))
+        offset = 1 + self.spread * self.random.random()
+        price = mid / offset if side == Side.buy else mid * offset
+        order = self.platform.add_order(
+            LimitOrder(
+                symbol=self.symbol,
+                size=Decimal(self.random.uniform(1, 10)).quantize(
+                    symbol_config.size_tick
+                ),
+                side=side,
+                price=Decimal(price).quantize(symbol_config.price_tick),
+                user_id=self.user_id,
+            )
+        )
+        if not order.completed:
+            self.open_orders.append(order.order_id)
+
+        while len(self.open_orders) > self.max_open:
+            try:
+                self.platform.cancel_order(self.open_orders.pop(0), self.symbol)
+            except TradingEngineException:
+                pass  # filled in the meantime
+
+
+ACTOR_TYPES: Dict[str, Callable[..., threading.Thread]] = {
+    "random_walk": RandomWalk,
+    "quoter": Quoter,
+    "book_poller": BookPoller,
+    "constant_product": ConstantProductMaker,
+}
+
+
+def _proc_status_bytes(field: str) -> Optional[int]:
+    # linux only; reported in kB
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _rss_bytes() -> Optional[int]:
+    """current resident set size, where /proc has it"""
+    return _proc_status_bytes("VmRSS")
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    peak = _proc_status_bytes("VmHWM")
+    if peak is not None or resource is None:
+        return peak
+    # ru_maxrss is KiB on linux, bytes on macos
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def build_actors(
+    scenario: Scenario, platform, stop_flag: threading.Event
+) -> List[threading.Thread]:
+    symbols = list(platform.symbol_configs)
+    actors = []
+    traders = 0
+    for spec in scenario.actors:
+        try:
+            actor_type = ACTOR_TYPES[spec.type]
+        except KeyError:
+            raise ValueError(f"unknown actor type {spec.type!r}")
+
+        for _ in range(spec.count):
+            i = len(actors)
+            seed = None if scenario.seed is None else scenario.seed + i
+            kwargs: Dict[str, Any] = dict(stop_flag=stop_flag, seed=seed)
+            # book pollers never trade, so users are shared among the rest
+            if actor_type is not BookPoller:
+                kwargs["user_id"] = f"user{traders % scenario.users}"
+                traders += 1
+            if actor_type is RandomWalk:
+                kwargs["initial_price"] = scenario.initial_price
+            elif actor_type is ConstantProductMaker:
+                kwargs["starting_price"] = scenario.initial_price
+            kwargs.update(spec.params)
+            actors.append(actor_type(platform, symbols[i % len(symbols)], **kwargs))
+    return actors
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    platform = Platform(scenario.platform_config())
+    lock = platform.lock = InstrumentedLock(platform.lock)
+    instrumented = InstrumentedPlatform(platform)
+
+    stop_flag = threading.Event()
+    actors = build_actors(scenario, instrumented, stop_flag)
+
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    for actor in actors:
+        actor.start()
+
+    while True:
+        elapsed = time.perf_counter() - start
+        if scenario.duration is not None and elapsed >= scenario.duration:
+            break
+        if scenario.operations is not None and (
+            instrumented.operations >= scenario.operations
+        ):
+            break
+        if not any(actor.is_alive() for actor in actors):
+            break
+        time.sleep(0.05)
+
+    stop_flag.set()
+    for actor in actors:
+        actor.join()
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_bytes()
+    peak_rss = _peak_rss_bytes()
+
+    histograms = instrumented.histograms()
+    operations = sum(h.total for h in histograms.values())
+    return {
+        "scenario": scenario.dict(),
+        "elapsed": elapsed,
+        "operations": operations,
+        "throughput": operations / elapsed if elapsed else 0.0,
+        "latency": {
+            name: {
+                "count": histogram.total,
+                **{f"p{p:g}": histogram.percentile(p) for p in PERCENTILES},
+                "max": histogram.max,
+            }
+            for name, histogram in histograms.items()
+        },
+        "trades": sum(
+            len(e._trades) for e in platform.trading_engine.loaded().values()
+        ),
+        "trading_users": len(
+            {
+                actor.user_id
+                for actor in actors
+                if getattr(actor, "user_id", None) is not None
+            }
+        ),
+        "rss_before": rss_before,
+        "rss_after": rss_after,
+        "peak_rss": peak_rss,
+        "lock": {
+            "acquisitions": lock.acquisitions,
+            "contended": lock.contended,
+            "wait_time": lock.wait_time,
+        },
+        "actor_errors": [
+            repr(actor.exception) for actor in actors if actor.exception is not None
+        ],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"scenario {report['scenario']['name']}: "
+        f"{report['operations']} ops in {report['elapsed']:.2f}s "
+        f"({report['throughput']:.0f} ops/s), {report['trades']} trades",
+        f"trading users: {report['trading_users']} "
+        f"of {report['scenario']['users']} in the scenario",
+        f"{'operation':14} {'count':>9}"
+        + "".join(f" {f'p{p:g}':>9}" for p in PERCENTILES)
+        + f" {'max':>9}   (ms)",
+    ]
+    for name, latency in report["latency"].items():
+        lines.append(
+            f"{name:14} {latency['count']:9d}"
+            + "".join(f" {latency[f'p{p:g}'] * 1e3:9.3f}" for p in PERCENTILES)
+            + f" {latency['max'] * 1e3:9.3f}"
+        )
+
+    lock = report["lock"]
+    contended = lock["contended"] / lock["acquisitions"] if lock["acquisitions"] else 0
+    lines.append(
+        f"platform lock: {lock['acquisitions']} acquisitions, "
+        f"{contended:.1%} contended, {lock['wait_time']:.3f}s waiting"
+    )
+    if report["rss_after"] is not None:
+        growth = report["rss_after"] - report["rss_before"]
+        lines.append(
+            f"rss: {report['rss_after'] / 2 ** 20:.1f} MiB "
+            f"({growth / 2 ** 20:+.1f} MiB during run)"
+        )
+    if report["peak_rss"] is not None:
+        lines.append(f"peak rss: {report['peak_rss'] / 2 ** 20:.1f} MiB")
+    for error in report["actor_errors"]:
+        lines.append(f"actor error: {error}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", help="scenario JSON file")
+    parser.add_argument("--duration", type=float, help="override duration (s)")
+    parser.add_argument("--operations", type=int, help="override operation count")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    scenario = Scenario.from_file(args.scenario)
+    if args.duration is not None:
+        scenario.duration = args.duration
+    if args.operations is not None:
+        scenario.operations = args.operations
+        if args.duration is None:
+            scenario.duration = None
+
+    report = run_scenario(scenario)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=2, default=str)
+
+    return 1 if report["actor_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,246 @@
-from fastapi import FastAPI
+"""HTTP and WebSocket API for a Platform
 
-app = FastAPI()
+    uvicorn pumpdump.main:app
+
+Decimals are sent as strings so that prices and sizes round-trip exactly.
+Errors are returned as ``{"error": <exception class name>, "detail": ...}``.
+
+The ``/ws`` market data socket takes ``{"subscribe": symbol, "depth": n}`` and
+``{"unsubscribe": symbol}`` messages and pushes an order book whenever a
+subscribed book has changed, checking every ``interval`` seconds.
+"""
+import asyncio
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    FastAPI,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import ValidationError
+
+from pumpdump.encoding import encode
+from pumpdump.platform.exceptions import (
+    InsufficientBalance,
+    OrderNotFound,
+    PlatformException,
+    UnrecognizedSymbol,
+)
+from pumpdump.platform.order import Side, parse_order
+from pumpdump.platform.platform import Platform
+
+ERRORS = (PlatformException, InsufficientBalance, ValidationError)
+
+
+class JSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
+
+
+def _error(exc: Exception) -> Dict[str, Any]:
+    if isinstance(exc, ValidationError):
+        return {"error": "ValidationError", "detail": exc.errors()}
+    return {"error": type(exc).__name__, "detail": str(exc)}
+
+
+def _status_code(exc: Exception) -> int:
+    if isinstance(exc, OrderNotFound):
+        return 404
+    if isinstance(exc, ValidationError):
+        return 422
+    return 400
+
+
+# symbol -> (depth, book version seen, last book sent)
+_Subscriptions = Dict[str, Tuple[Optional[int], int, Optional[bytes]]]
+
+
+async def stream_market_data(
+    websocket: WebSocket, platform: Platform, interval: float
+) -> None:
+    """serve one /ws connection until the client goes away"""
+    await websocket.accept()
+    subscriptions: _Subscriptions = {}
+    receive = asyncio.ensure_future(websocket.receive_json())
+    try:
+        while True:
+            done, _ = await asyncio.wait({receive}, timeout=interval)
+            if done:
+                message = receive.result()
+                receive = asyncio.ensure_future(websocket.receive_json())
+                await _on_message(websocket, platform, subscriptions, message)
+            await _send_changed_books(websocket, platform, subscriptions)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receive.cancel()
+
+
+async def _on_message(
+    websocket: WebSocket,
+    platform: Platform,
+    subscriptions: _Subscriptions,
+    message: Dict[str, Any],
+) -> None:
+    if "subscribe" in message:
+        symbol = message["subscribe"]
+        if symbol not in platform.trading_engine:
+            await websocket.send_text(
+                encode(_error(UnrecognizedSymbol(symbol))).decode()
+            )
+            return
+        subscriptions[symbol] = (message.get("depth"), -1, None)
+    elif "unsubscribe" in message:
+        subscriptions.pop(message["unsubscribe"], None)
+
+
+async def _send_changed_books(
+    websocket: WebSocket, platform: Platform, subscriptions: _Subscriptions
+) -> None:
+    for symbol, (depth, seen, last) in list(subscriptions.items()):
+        engine = platform.trading_engine[symbol]
+        # read before encoding, so a change made meanwhile is sent next time
+        # rather than missed
+        version = engine.book_version
+        next_expiry = engine.next_expiry
+        if version == seen and (next_expiry is None or next_expiry > platform.clock()):
+            continue
+
+        # the cached encoding, shared by every subscriber until the book
+        # changes again
+        book = await run_in_threadpool(platform.order_book_json, symbol, depth)
+        subscriptions[symbol] = (depth, version, book)
+        if book is not last:
+            await websocket.send_text(book.decode())
+
+
+router = APIRouter()
+
+
+def _platform(request: Request) -> Platform:
+    return request.app.state.platform
+
+
+async def platform_error(request: Request, exc: Exception):
+    return JSONResponse(_error(exc), status_code=_status_code(exc))
+
+
+# Platform methods block on its lock, so the HTTP handlers are plain functions,
+# which FastAPI runs in its threadpool rather than on the loop
+@router.post("/orders")
+def add_order(
+    order: Dict[str, Any] = Body(...), platform: Platform = Depends(_platform)
+):
+    return JSONResponse(platform.add_order(parse_order(order)))
+
+
+@router.post("/orders/batch")
+def add_orders(
+    orders: List[Dict[str, Any]] = Body(...), platform: Platform = Depends(_platform)
+):
+    # one result per order, in order; a rejected order does not stop the rest
+    # of the batch
+    results = []
+    for order in orders:
+        try:
+            results.append({"order": platform.add_order(parse_order(order))})
+        except ERRORS as e:
+            results.append(_error(e))
+    return JSONResponse(results)
+
+
+@router.get("/orders/{order_id}")
+def order_status(
+    order_id: str,
+    symbol: Optional[str] = None,
+    platform: Platform = Depends(_platform),
+):
+    return JSONResponse(platform.order_status(order_id, symbol))
+
+
+@router.delete("/orders/{order_id}")
+def cancel_order(
+    order_id: str,
+    symbol: Optional[str] = None,
+    platform: Platform = Depends(_platform),
+):
+    return JSONResponse(platform.cancel_order(order_id, symbol))
+
+
+@router.patch("/orders/{order_id}")
+def amend_order(
+    order_id: str,
+    amendment: Dict[str, Any] = Body(...),
+    symbol: Optional[str] = None,
+    platform: Platform = Depends(_platform),
+):
+    return JSONResponse(
+        platform.amend_order(
+            order_id, amendment.get("size"), amendment.get("price"), symbol
+        )
+    )
+
+
+@router.get("/order_book/{symbol}")
+def order_book(
+    symbol: str,
+    depth: Optional[int] = None,
+    platform: Platform = Depends(_platform),
+):
+    return Response(
+        platform.order_book_json(symbol, depth), media_type="application/json"
+    )
+
+
+@router.get("/quote/{symbol}")
+def quote(
+    symbol: str,
+    side: Side,
+    size: Decimal = Query(..., gt=0),
+    platform: Platform = Depends(_platform),
+):
+    return JSONResponse(platform.quote(symbol, side, size))
+
+
+@router.get("/size_for_price/{symbol}")
+def size_for_price(
+    symbol: str,
+    side: Side,
+    limit_price: Decimal = Query(..., gt=0),
+    platform: Platform = Depends(_platform),
+):
+    return JSONResponse(platform.size_for_price(symbol, side, limit_price))
+
+
+@router.get("/balance/{user_id}")
+def balance(user_id: str, platform: Platform = Depends(_platform)):
+    return JSONResponse(platform.balance(user_id))
+
+
+@router.websocket("/ws")
+async def market_data(websocket: WebSocket):
+    state = websocket.app.state
+    await stream_market_data(websocket, state.platform, state.interval)
+
+
+def create_app(platform: Optional[Platform] = None, interval: float = 0.05):
+    app = FastAPI()
+    app.state.platform = platform or Platform()
+    app.state.interval = interval
+    for exc_class in ERRORS:
+        app.add_exception_handler(exc_class, platform_error)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
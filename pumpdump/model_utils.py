@@ -1,6 +1,10 @@
+import json
 import uuid
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from pydantic.json import pydantic_encoder
 
 if TYPE_CHECKING:
     static_check_init_args = dataclass
@@ -15,3 +19,15 @@ def uuid_hex(name=None):
         return uuid.uuid5(uuid.uuid4(), name).hex
 
     return uuid.uuid4().hex
+
+
+def _json_default(value: Any) -> Any:
+    # Decimal as a string so that prices and sizes round-trip exactly
+    if isinstance(value, Decimal):
+        return str(value)
+    return pydantic_encoder(value)
+
+
+def json_dumps(content: Any) -> str:
+    """compact JSON for models, and lists and dicts of them"""
+    return json.dumps(content, default=_json_default, separators=(",", ":"))
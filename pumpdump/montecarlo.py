@@ -0,0 +1,197 @@
+"""Run many seeded simulations across a process pool.
+
+Each simulation builds a fresh Platform, seeds every symbol with a constant
+product book and steps its actors in lockstep without sleeping or threads, so
+a run is reproducible from its seed. Workers send back a compact RunSummary
+per run as soon as it finishes; the pool and its already-imported workers are
+reused for every scenario submitted to the same MonteCarloRunner.
+"""
+import random
+import statistics
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from pumpdump.loadgen import Scenario, build_actors
+from pumpdump.model_utils import static_check_init_args
+from pumpdump.platform.platform import Platform
+from pumpdump.utils import generate_constant_product_book
+
+
+@static_check_init_args
+class SimulationScenario(Scenario):
+    steps: int = Field(default=1000, description="upkeep calls per actor")
+    sample_every: int = Field(default=10, description="steps between samples")
+    base_reserve: float = 1e6
+    quote_reserve: Optional[float] = Field(
+        default=None, description="defaults to base_reserve * initial_price"
+    )
+    book_levels: int = 30
+
+
+@static_check_init_args
+class RunSummary(BaseModel):
+    seed: Optional[int]
+    steps: int
+    trade_count: Dict[str, int]
+    price_path: Dict[str, List[Optional[float]]] = Field(
+        description="mid price per symbol at every sample, None if a side is empty"
+    )
+    mean_spread: Dict[str, Optional[float]]
+    max_spread: Dict[str, Optional[float]]
+    final_balances: Dict[str, Dict[str, float]] = Field(
+        description="user -> asset -> total, for users with actors"
+    )
+    actor_errors: List[str] = Field(default_factory=list)
+
+
+def _top_of_book(platform: Platform, symbol: str):
+    book = platform.order_book(symbol, depth=1)
+    if not book.bids or not book.asks:
+        return None
+    return float(book.bids[0].price), float(book.asks[0].price)
+
+
+def run_simulation(scenario: SimulationScenario) -> RunSummary:
+    platform = Platform(scenario.platform_config())
+    rng = random.Random(scenario.seed)
+    symbols = list(platform.symbol_configs)
+
+    quote_reserve = scenario.quote_reserve or (
+        scenario.base_reserve * scenario.initial_price
+    )
+    for symbol in symbols:
+        generate_constant_product_book(
+            symbol,
+            platform,
+            base_reserve=scenario.base_reserve,
+            quote_reserve=quote_reserve,
+            levels=scenario.book_levels,
+            rng=rng,
+        )
+
+    actors = build_actors(scenario, platform, threading.Event())
+    actor_errors: List[str] = []
+    price_path: Dict[str, List[Optional[float]]] = {s: [] for s in symbols}
+    spreads: Dict[str, List[float]] = {s: [] for s in symbols}
+
+    for step in range(scenario.steps):
+        for actor in list(actors):
+            try:
+                actor.upkeep()
+            except Exception as e:
+                actor_errors.append(repr(e))
+                actors.remove(actor)
+
+        if step % scenario.sample_every == 0 or step == scenario.steps - 1:
+            for symbol in symbols:
+                top = _top_of_book(platform, symbol)
+                if top is None:
+                    price_path[symbol].append(None)
+                    continue
+                bid, ask = top
+                price_path[symbol].append((bid + ask) / 2)
+                spreads[symbol].append(ask - bid)
+
+    users = {getattr(actor, "user_id", None) for actor in actors} - {None}
+    return RunSummary(
+        seed=scenario.seed,
+        steps=scenario.steps,
+        trade_count={
+            symbol: len(engine._trades)
+            for symbol, engine in platform.trading_engine.loaded().items()
+        },
+        price_path=price_path,
+        mean_spread={s: statistics.mean(v) if v else None for s, v in spreads.items()},
+        max_spread={s: max(v) if v else None for s, v in spreads.items()},
+        final_balances={
+            user: {
+                asset: float(balance.total)
+                for asset, balance in platform.balance(user).balances.items()
+            }
+            for user in sorted(users)
+        },
+        actor_errors=actor_errors,
+    )
+
+
+def _warm_worker() -> None:
+    # pay for pydantic model creation once per worker rather than per run
+    Platform()
+
+
+class MonteCarloRunner:
+    """fan scenarios out over a long-lived process pool
+
+    use as a context manager, or call shutdown() when done
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, executor: Optional[Executor] = None
+    ) -> None:
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_warm_worker
+        )
+
+    def __enter__(self) -> "MonteCarloRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def run(self, scenarios: Iterable[SimulationScenario]) -> Iterator[RunSummary]:
+        """yield summaries in completion order"""
+        futures = [self.executor.submit(run_simulation, s) for s in scenarios]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def run_seeds(
+        self, scenario: SimulationScenario, seeds: Iterable[int]
+    ) -> Iterator[RunSummary]:
+        return self.run(scenario.copy(update={"seed": seed}) for seed in seeds)
+
+
+def _describe(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"mean": None, "stdev": None, "min": None, "max": None}
+    return {
+        "mean": statistics.mean(values),
+        "stdev": statistics.pstdev(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def aggregate(summaries: Iterable[RunSummary]) -> Dict[str, object]:
+    """distribution of per-run outcomes, per symbol"""
+    runs = 0
+    trade_counts: Dict[str, List[float]] = {}
+    final_prices: Dict[str, List[float]] = {}
+    mean_spreads: Dict[str, List[float]] = {}
+    errors = 0
+
+    for summary in summaries:
+        runs += 1
+        errors += bool(summary.actor_errors)
+        for symbol, count in summary.trade_count.items():
+            trade_counts.setdefault(symbol, []).append(count)
+        for symbol, path in summary.price_path.items():
+            prices = [p for p in path if p is not None]
+            if prices:
+                final_prices.setdefault(symbol, []).append(prices[-1])
+        for symbol, spread in summary.mean_spread.items():
+            if spread is not None:
+                mean_spreads.setdefault(symbol, []).append(spread)
+
+    return {
+        "runs": runs,
+        "runs_with_errors": errors,
+        "trade_count": {s: _describe(v) for s, v in trade_counts.items()},
+        "final_price": {s: _describe(v) for s, v in final_prices.items()},
+        "mean_spread": {s: _describe(v) for s, v in mean_spreads.items()},
+    }
@@ -0,0 +1,233 @@
+"""Persist platform events to SQLite from a background thread.
+
+    sink = SqliteSink("run.db")
+    sink.start()
+    platform.listeners.append(sink)
+    ...
+    sink.close()
+
+Events are reduced to tuples of attribute values on the calling thread,
+queued on a bounded queue and written by the sink's own thread in large
+transactions on a WAL mode database. What happens when the queue is full is
+chosen by ``policy``: ``"drop"`` (the default) never waits and counts the event
+in ``dropped``, ``"block"`` waits for room for at most ``block_timeout``
+seconds, then drops. Nothing waits on a writer that is not running, so a sink
+that was never started or whose writer failed cannot stall the platform.
+"""
+import enum
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from pumpdump.platform.order import Order
+from pumpdump.platform.platform import PlatformListener
+from pumpdump.platform.trade import Trade
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    order_type TEXT NOT NULL,
+    price TEXT,
+    size TEXT NOT NULL,
+    user_id TEXT,
+    order_tag TEXT,
+    create_time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    sequence INTEGER PRIMARY KEY,
+    trade_id TEXT NOT NULL,
+    symbol TEXT,
+    price TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    taker_side TEXT,
+    taker_order_id TEXT,
+    maker_order_id TEXT
+);
+CREATE TABLE IF NOT EXISTS cancels (
+    order_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    canceled TEXT NOT NULL,
+    remaining TEXT NOT NULL
+);
+"""
+
+_INSERTS = {
+    "order": "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "trade": "INSERT OR REPLACE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "cancel": "INSERT INTO cancels VALUES (?, ?, ?, ?)",
+}
+
+_STOP = object()
+
+
+def _sql_value(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class SqliteSink(PlatformListener, threading.Thread):
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_queue: int = 100_000,
+        batch_size: int = 10_000,
+        poll_interval: float = 0.5,
+        policy: str = "drop",
+        block_timeout: float = 1.0,
+    ) -> None:
+        if policy not in ("drop", "block"):
+            raise ValueError(f"unknown backpressure policy {policy!r}")
+
+        threading.Thread.__init__(self, name="sqlite sink", daemon=True)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.exception: Optional[Exception] = None
+
+    # producer side, called under the platform lock
+
+    def _put(self, event: Tuple[str, tuple]) -> None:
+        try:
+            if self.policy == "block" and self.exception is None and self.is_alive():
+                self.queue.put(event, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    # only attribute reads happen here, converting to SQL values is left to
+    # the writer thread
+
+    def on_order(self, order: Order) -> None:
+        self._put(
+            (
+                "order",
+                (
+                    order.order_id,
+                    order.symbol,
+                    order.side,
+                    order.order_type,
+                    getattr(order, "price", None),
+                    order.size,
+                    order.user_id,
+                    order.order_tag,
+                    order.create_time,
+                ),
+            )
+        )
+
+    def on_trade(self, trade: Trade) -> None:
+        self._put(
+            (
+                "trade",
+                (
+                    trade.sequence,
+                    trade.trade_id,
+                    trade.symbol,
+                    trade.price,
+                    trade.amount,
+                    trade.timestamp,
+                    trade.taker_side,
+                    trade.taker_order_id,
+                    trade.maker_order_id,
+                ),
+            )
+        )
+
+    def on_cancel(self, order: Order) -> None:
+        self._put(
+            ("cancel", (order.order_id, order.symbol, order.canceled, order.remaining))
+        )
+
+    # writer side
+
+    def run(self):
+        try:
+            connection = sqlite3.connect(self.path)
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(SCHEMA)
+                self._write_loop(connection)
+            finally:
+                connection.close()
+        except Exception as e:
+            self.exception = e
+            raise
+
+    def _write_loop(self, connection: sqlite3.Connection) -> None:
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(event is _STOP for event in batch)
+            try:
+                self._write(
+                    connection, [event for event in batch if event is not _STOP]
+                )
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, connection: sqlite3.Connection, batch: List) -> None:
+        rows = {kind: [] for kind in _INSERTS}
+        for kind, row in batch:
+            rows[kind].append(tuple(map(_sql_value, row)))
+
+        with connection:
+            for kind, kind_rows in rows.items():
+                if kind_rows:
+                    connection.executemany(_INSERTS[kind], kind_rows)
+        self.written += len(batch)
+
+    def flush(self) -> None:
+        """wait until everything queued so far is committed
+
+        returns early if the writer is not running, and raises if it failed,
+        as what is left in the queue would never be written
+        """
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                if self.exception is not None:
+                    raise RuntimeError("sqlite sink writer failed") from self.exception
+                if not self.is_alive():
+                    return
+                self.queue.all_tasks_done.wait(self.poll_interval)
+
+    def close(self) -> None:
+        """write out what is queued and stop the writer thread"""
+        # waits for room only while the writer is still there to make it
+        while self.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=self.poll_interval)
+            except queue.Full:
+                continue
+            self.join()
@@ -1,2 +1,17 @@
 # flake8: noqa
-from .platform import Platform
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .platform import Platform
+
+__all__ = ["Platform"]
+
+
+def __getattr__(name):
+    if name != "Platform":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = importlib.import_module(".platform", __name__).Platform
+    globals()[name] = value
+    return value
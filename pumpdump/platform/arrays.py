@@ -0,0 +1,86 @@
+"""numpy views of engine state for analysis code
+
+numpy is an optional dependency and is only imported when one of these is
+called. Arrays are filled straight from the engine's aggregated levels and the
+trade index, without building PriceLevel or other pydantic models.
+"""
+import itertools
+from datetime import datetime
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from .candles import epoch_seconds
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .trade_index import TradeIndex
+    from .trading_engine import TradingEngine, _BookSide
+
+# timestamp is epoch seconds, taker_side is 1 for buy and -1 for sell
+TRADE_FIELDS = (
+    ("sequence", "i8"),
+    ("timestamp", "f8"),
+    ("price", "f8"),
+    ("amount", "f8"),
+    ("taker_side", "i1"),
+)
+
+
+class BookArrays(NamedTuple):
+    bid_prices: "np.ndarray"
+    bid_quantities: "np.ndarray"
+    ask_prices: "np.ndarray"
+    ask_quantities: "np.ndarray"
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required: pip install pumpdump[numpy]")
+    return numpy
+
+
+def _side_arrays(np, side: "_BookSide", depth: Optional[int]):
+    count = len(side.levels) if depth is None else min(depth, len(side.levels))
+    prices = np.fromiter(
+        itertools.islice(side.levels.keys(), count), dtype=np.float64, count=count
+    )
+    if side.sign < 0:
+        np.negative(prices, out=prices)
+    quantities = np.fromiter(
+        (level[0] for level in itertools.islice(side.levels.values(), count)),
+        dtype=np.float64,
+        count=count,
+    )
+    return prices, quantities
+
+
+def book_arrays(engine: "TradingEngine", depth: Optional[int] = None) -> BookArrays:
+    np = _numpy()
+    return BookArrays(
+        *_side_arrays(np, engine._bids, depth), *_side_arrays(np, engine._asks, depth)
+    )
+
+
+def trade_dtype():
+    return _numpy().dtype(list(TRADE_FIELDS))
+
+
+def trade_tape(
+    trade_index: "TradeIndex",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> "np.ndarray":
+    np = _numpy()
+    trades = trade_index.between(since, until)
+    tape = np.empty(len(trades), dtype=trade_dtype())
+    if not trades:
+        return tape
+
+    tape["sequence"] = [t.sequence for t in trades]
+    tape["timestamp"] = [epoch_seconds(t.timestamp) for t in trades]
+    tape["price"] = [t.price for t in trades]
+    tape["amount"] = [t.amount for t in trades]
+    tape["taker_side"] = [1 if t.taker_side == "buy" else -1 for t in trades]
+    return tape
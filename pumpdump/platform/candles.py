@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Mapping, Optional, Union
+
+from pydantic import BaseModel
+
+from pumpdump.model_utils import static_check_init_args
+
+from .exceptions import UnrecognizedInterval
+from .trade import Trade
+
+EPOCH = datetime(1970, 1, 1)
+
+# bucket layout: [open, high, low, close, volume]
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(5)
+
+
+@static_check_init_args
+class Candle(BaseModel):
+    symbol: str
+    interval: str
+    open_time: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+
+
+def epoch_seconds(timestamp: datetime) -> float:
+    # naive datetimes are UTC throughout the platform
+    if timestamp.tzinfo is None:
+        return (timestamp - EPOCH).total_seconds()
+    return timestamp.timestamp()
+
+
+class CandleSeries:
+    """candles for one symbol and interval
+
+    buckets are kept ordered by start time in parallel lists so that trades in
+    the current bucket are O(1) and range queries are a bisection. Only the
+    current bucket plus ``max_candles`` closed ones are guaranteed to be kept.
+    """
+
+    def __init__(self, seconds: int, max_candles: int) -> None:
+        self.seconds = seconds
+        self.max_candles = max_candles
+        self._starts: List[int] = []
+        self._buckets: List[list] = []
+
+    def __len__(self) -> int:
+        return min(len(self._starts), self.max_candles + 1)
+
+    def update(self, epoch: float, price: Decimal, amount: Decimal) -> None:
+        start = int(epoch // self.seconds) * self.seconds
+        starts = self._starts
+
+        if starts and starts[-1] == start:
+            bucket = self._buckets[-1]
+        elif not starts or starts[-1] < start:
+            starts.append(start)
+            self._buckets.append([price, price, price, price, amount])
+            self._trim()
+            return
+        else:
+            # trade stamped before the current bucket (the taker order was
+            # created earlier than it was added)
+            i = bisect_left(starts, start)
+            if starts[i] == start:
+                bucket = self._buckets[i]
+            elif i < len(starts) - len(self):
+                return  # older than the retained window
+            else:
+                starts.insert(i, start)
+                self._buckets.insert(i, [price, price, price, price, amount])
+                return
+
+        if price > bucket[_HIGH]:
+            bucket[_HIGH] = price
+        elif price < bucket[_LOW]:
+            bucket[_LOW] = price
+        bucket[_CLOSE] = price
+        bucket[_VOLUME] += amount
+
+    def _trim(self) -> None:
+        # trimming in chunks keeps appends amortised O(1)
+        if len(self._starts) > 2 * (self.max_candles + 1):
+            del self._starts[: -(self.max_candles + 1)]
+            del self._buckets[: -(self.max_candles + 1)]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None):
+        """(start, bucket) pairs with start in [start, end)"""
+        starts = self._starts
+        lo = len(starts) - len(self)
+        hi = len(starts)
+        if start is not None:
+            lo = max(lo, bisect_left(starts, start, lo, hi))
+        if end is not None:
+            hi = bisect_left(starts, end, lo, hi)
+        return zip(starts[lo:hi], self._buckets[lo:hi])
+
+
+class CandleAggregator:
+    """CandleSeries for every configured interval of one symbol"""
+
+    def __init__(
+        self, symbol: str, intervals: Mapping[str, int], max_candles: int
+    ) -> None:
+        self.symbol = symbol
+        self.series: Dict[str, CandleSeries] = {
+            name: CandleSeries(seconds, max_candles)
+            for name, seconds in intervals.items()
+        }
+
+    def on_trade(self, trade: Trade) -> None:
+        epoch = epoch_seconds(trade.timestamp)
+        for series in self.series.values():
+            series.update(epoch, trade.price, trade.amount)
+
+    def candles(
+        self,
+        interval: str,
+        start: Union[datetime, float, None] = None,
+        end: Union[datetime, float, None] = None,
+    ) -> List[Candle]:
+        try:
+            series = self.series[interval]
+        except KeyError:
+            raise UnrecognizedInterval(interval)
+
+        if isinstance(start, datetime):
+            start = epoch_seconds(start)
+        if isinstance(end, datetime):
+            end = epoch_seconds(end)
+
+        return [
+            Candle(
+                symbol=self.symbol,
+                interval=interval,
+                open_time=EPOCH + timedelta(seconds=bucket_start),
+                open=bucket[_OPEN],
+                high=bucket[_HIGH],
+                low=bucket[_LOW],
+                close=bucket[_CLOSE],
+                volume=bucket[_VOLUME],
+            )
+            for bucket_start, bucket in series.range(start, end)
+        ]
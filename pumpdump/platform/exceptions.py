@@ -14,6 +14,10 @@ class UnrecognizedOrderType(PlatformException):
     pass
 
 
+class UnrecognizedInterval(PlatformException):
+    pass
+
+
 class TradingEngineException(PlatformException):
     pass
 
@@ -40,3 +44,7 @@ class OrderAlreadyCompleted(TradingEngineException):
 
 class OrderNotFound(TradingEngineException):
     pass
+
+
+class InvalidAmendment(TradingEngineException):
+    pass
@@ -1,9 +1,10 @@
 import enum
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import DefaultDict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Mapping, Optional, Type, TypeVar
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, root_validator, validator
 
 from pumpdump.model_utils import static_check_init_args, uuid_hex
 from pumpdump.platform.trade import Trade
@@ -38,6 +39,15 @@ class Side(str, enum.Enum):
 
 class OrderType(str, enum.Enum):
     limit_order = "limit_order"
+    stop_limit_order = "stop_limit_order"
+    stop_market_order = "stop_market_order"
+
+
+class TimeInForce(str, enum.Enum):
+    gtc = "gtc"  # good till canceled
+    ioc = "ioc"  # immediate or cancel: whatever does not fill at once is canceled
+    fok = "fok"  # fill or kill: fills completely at once or not at all
+    gtd = "gtd"  # good till date: canceled at expire_time
 
 
 @static_check_init_args
@@ -47,12 +57,20 @@ class Order(BaseModel):
     side: Side
     order_type: OrderType
     canceled: Optional[datetime] = None
+    requeued: Optional[datetime] = Field(
+        default=None, description="when an amendment last moved it to the back"
+    )
     trades: List[Trade] = []
     order_id: str = Field(default_factory=uuid_hex)
-    fees: dict = DefaultDict(default_factory=Decimal)
+    fees: dict = Field(default_factory=lambda: defaultdict(Decimal))
     create_time: datetime = Field(default_factory=datetime.utcnow)
     user_id: Optional[str] = None
     order_tag: Optional[str] = None
+    time_in_force: TimeInForce = TimeInForce.gtc
+    expire_time: Optional[datetime] = None
+    ttl: Optional[timedelta] = Field(
+        default=None, description="sets expire_time to create_time + ttl"
+    )
 
     @property
     def dealt(self) -> Decimal:
@@ -72,6 +90,21 @@ class Order(BaseModel):
             raise ValueError("must be greater than zero")
         return v
 
+    @root_validator(skip_on_failure=True)
+    def good_till_date(cls, values):
+        # an expire_time or ttl makes an order good till date
+        if values["ttl"] is not None and values["expire_time"] is None:
+            values["expire_time"] = values["create_time"] + values["ttl"]
+
+        if values["expire_time"] is not None:
+            if values["time_in_force"] == TimeInForce.gtc:
+                values["time_in_force"] = TimeInForce.gtd
+            elif values["time_in_force"] != TimeInForce.gtd:
+                raise ValueError("only good till date orders expire")
+        elif values["time_in_force"] == TimeInForce.gtd:
+            raise ValueError("good till date orders need expire_time or ttl")
+        return values
+
 
 @static_check_init_args
 class PricedOrder(Order):
@@ -87,3 +120,51 @@ class PricedOrder(Order):
 @static_check_init_args
 class LimitOrder(PricedOrder):
     order_type = OrderType.limit_order
+
+
+@static_check_init_args
+class StopOrder(Order):
+    """rests off the book until a trade prints at or through stop_price
+
+    at or above it for a buy, at or below it for a sell
+    """
+
+    stop_price: Decimal = Field()
+    triggered: Optional[datetime] = None
+
+    @validator("stop_price")
+    def stop_price_must_gte_zero(cls, v):
+        if v <= 0:
+            raise ValueError("must be greater than zero")
+        return v
+
+
+@static_check_init_args
+class StopLimitOrder(StopOrder, PricedOrder):
+    """becomes a limit order at price when triggered"""
+
+    order_type = OrderType.stop_limit_order
+
+
+@static_check_init_args
+class StopMarketOrder(StopOrder):
+    """trades against the book at any price when triggered, whatever does not
+    fill is canceled"""
+
+    order_type = OrderType.stop_market_order
+
+
+ORDER_CLASSES: Dict[OrderType, Type[Order]] = {
+    OrderType.limit_order: LimitOrder,
+    OrderType.stop_limit_order: StopLimitOrder,
+    OrderType.stop_market_order: StopMarketOrder,
+}
+
+
+def parse_order(data: Mapping[str, Any]) -> Order:
+    """build the Order subclass named by data["order_type"]"""
+    try:
+        order_class = ORDER_CLASSES[OrderType(data.get("order_type"))]
+    except ValueError:
+        order_class = Order
+    return order_class.parse_obj(data)
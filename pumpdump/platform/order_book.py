@@ -1,11 +1,12 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 from pydantic.fields import Field
 
 from pumpdump.model_utils import static_check_init_args
+from pumpdump.platform.order import Side
 
 
 @static_check_init_args
@@ -20,3 +21,19 @@ class OrderBook(BaseModel):
     bids: List[PriceLevel]
     asks: List[PriceLevel]
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+@static_check_init_args
+class Quote(BaseModel):
+    """what an order on side would fill against the book as it stands"""
+
+    symbol: str
+    side: Side
+    size: Decimal = Field(description="base that would fill")
+    notional: Decimal = Field(description="quote that would change hands")
+    vwap: Optional[Decimal] = None
+    worst_price: Optional[Decimal] = None
+    levels: int = Field(description="price levels traded into")
+    unfilled: Decimal = Field(
+        default=Decimal(0), description="part of the size asked for left over"
+    )
@@ -1,11 +1,19 @@
+import itertools
 import threading
 from collections import defaultdict
-from typing import Dict, List, Mapping, Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
-from pumpdump import PlatformConfig, SymbolConfig, default_config
+from pumpdump._config import PlatformConfig, SymbolConfig, default_config
+from pumpdump.platform import arrays
+from pumpdump.platform.arrays import BookArrays
 from pumpdump.platform.balance import AssetBalance, Balance, BalanceData
-from pumpdump.platform.order import Order, OrderType, PricedOrder, Side
-from pumpdump.platform.trade import Trade
+from pumpdump.platform.candles import Candle
+from pumpdump.platform.order import LimitOrder, Order, PricedOrder, Side, StopOrder
+from pumpdump.platform.order_book import OrderBook, Quote
+from pumpdump.platform.trade import Trade, TradePage
+from pumpdump.platform.trade_index import TradeIndex
 from pumpdump.platform.trading_engine import TradingEngine
 
 from .exceptions import (
@@ -16,27 +24,103 @@ from .exceptions import (
 )
 
 
-class Platform:
-    def __init__(self, config: Optional[PlatformConfig] = None) -> None:
-        self.config = config or default_config
-        self._account_balance: Mapping[str, Balance] = defaultdict(
-            self._default_balance
-        )
-        self._account_balance.update(
-            {
-                user_id: BalanceData(
-                    __root__={
-                        asset: AssetBalance(available=start_balance)
-                        for asset, start_balance in (balance.balances.items())
-                    }
-                )
-                for user_id, balance in self.config.balance_config.items()
-            }
+class TradingEngines(Mapping):
+    """mapping of symbol to TradingEngine, creating each engine on first access"""
+
+    def __init__(
+        self,
+        config: PlatformConfig,
+        funds: Optional[Callable[[Order], Optional[Decimal]]] = None,
+    ) -> None:
+        self.config = config
+        self.funds = funds
+        self._engines: Dict[str, TradingEngine] = {}
+        self._sequence = itertools.count(1)
+
+    def __getitem__(self, symbol: str) -> TradingEngine:
+        try:
+            return self._engines[symbol]
+        except KeyError:
+            pass
+
+        if symbol not in self.config.symbol_configs:
+            raise KeyError(symbol)
+
+        return self._engines.setdefault(
+            symbol, TradingEngine(symbol, self.config, self._sequence, self.funds)
         )
-        # TODO: remove dependence on global config object
-        self.trading_engine: Mapping[str, TradingEngine] = {
-            symbol: TradingEngine(symbol) for symbol in self.config.symbol_configs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.config.symbol_configs)
+
+    def __len__(self) -> int:
+        return len(self.config.symbol_configs)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.config.symbol_configs
+
+    def loaded(self) -> Dict[str, TradingEngine]:
+        """engines that have been created so far, without creating any others"""
+        return dict(self._engines)
+
+
+class AccountBalances(dict):
+    """user_id -> BalanceData, built from the balance config on first access"""
+
+    def __init__(self, config: PlatformConfig) -> None:
+        super().__init__()
+        self.config = config
+
+    def __missing__(self, user_id: Optional[str]) -> BalanceData:
+        try:
+            initial = self.config.balance_config[user_id]
+        except KeyError:
+            initial = self.config.balance_config[None]
+
+        return self.setdefault(user_id, _balance_data(initial.balances))
+
+
+def _balance_data(balances: Mapping[str, Decimal]) -> BalanceData:
+    return BalanceData(
+        __root__={
+            asset: AssetBalance(available=start_balance)
+            for asset, start_balance in balances.items()
         }
+    )
+
+
+class PlatformListener:
+    """receives platform events
+
+    methods are called with the platform lock held, in the order the events
+    happen, so implementations should hand work off rather than do it inline
+    """
+
+    def on_order(self, order: Order) -> None:
+        pass
+
+    def on_trade(self, trade: Trade) -> None:
+        pass
+
+    def on_cancel(self, order: Order) -> None:
+        pass
+
+
+class Platform:
+    def __init__(
+        self,
+        config: Optional[PlatformConfig] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ) -> None:
+        """
+        clock: current time for expiring good till date orders, naive UTC
+        """
+        self.config = config or default_config
+        self.clock = clock or datetime.utcnow
+        self._account_balance = AccountBalances(self.config)
+        self.trading_engine = TradingEngines(self.config, self._funds)
+        self._user_trades: Dict[str, TradeIndex] = defaultdict(TradeIndex)
+        self.listeners: List[PlatformListener] = []
         self.lock = threading.Lock()
 
     @property
@@ -44,14 +128,7 @@ class Platform:
         return self.config.symbol_configs
 
     def _default_balance(self):
-        return BalanceData(
-            __root__={
-                asset: AssetBalance(available=start_balance)
-                for asset, start_balance in self.config.balance_config[
-                    None
-                ].balances.items()
-            }
-        )
+        return _balance_data(self.config.balance_config[None].balances)
 
     def balance(self, user_id: Optional[str]) -> Balance:
         if user_id is None:
@@ -59,10 +136,18 @@ class Platform:
 
         return Balance(balances=self._account_balance[user_id], user_id=user_id)
 
+    def _index_user_trade(self, user_id: str, trade: Trade) -> None:
+        user_trades = self._user_trades[user_id]
+        # a self-trade reaches here once per side but is indexed once
+        if user_trades.last_sequence != trade.sequence:
+            user_trades.append(trade)
+
     def _on_trade(self, order: Order, trade: Trade):
         if order.user_id is None:
             return
 
+        self._index_user_trade(order.user_id, trade)
+
         base = self.config.symbol_configs[order.symbol].base
         quote = self.config.symbol_configs[order.symbol].quote
 
@@ -71,9 +156,13 @@ class Platform:
                 self._account_balance[order.user_id][base].available += trade.amount
             if quote is not None:
                 if isinstance(order, PricedOrder):
+                    # reserved at the limit price, any price improvement is
+                    # handed back
                     self._account_balance[order.user_id][quote].reserved -= (
-                        trade.amount * trade.price
+                        trade.amount * order.price
                     )
+                    improvement = trade.amount * (order.price - trade.price)
+                    self._account_balance[order.user_id][quote].available += improvement
                 else:
                     self._account_balance[order.user_id][quote].available -= (
                         trade.amount * trade.price
@@ -92,20 +181,39 @@ class Platform:
 
         # TODO: add other callbacks (for websocket?)
 
-    def _reserve_asset(self, order: Order):
-        if order.user_id is None:
-            return
-
-        if not isinstance(order, PricedOrder):
-            return
+    def _reservation(
+        self, order: Order, remaining: Decimal, price: Optional[Decimal] = None
+    ) -> Tuple[Optional[str], Decimal]:
+        """asset and amount held for remaining of an order at price, which
+        defaults to the order's"""
+        if order.user_id is None or not isinstance(order, PricedOrder):
+            return None, Decimal(0)
 
         if order.side == Side.buy:
-            reserve_amount = order.size * order.price
-            asset = self.config.symbol_configs[order.symbol].quote
+            return (
+                self.config.symbol_configs[order.symbol].quote,
+                remaining * (order.price if price is None else price),
+            )
         elif order.side == Side.sell:
-            reserve_amount = order.size
-            asset = self.config.symbol_configs[order.symbol].base
+            return self.config.symbol_configs[order.symbol].base, remaining
+
+    def _funds(self, order: Order) -> Optional[Decimal]:
+        """available balance a stop market order can trade once triggered
 
+        nothing is reserved for an order with no price, so the engine stops
+        filling it when this runs out and cancels the rest
+        """
+        if order.user_id is None:
+            return None
+
+        symbol_config = self.config.symbol_configs[order.symbol]
+        asset = symbol_config.quote if order.side == Side.buy else symbol_config.base
+        if asset is None:
+            return None
+        return self._account_balance[order.user_id][asset].available
+
+    def _reserve_asset(self, order: Order):
+        asset, reserve_amount = self._reservation(order, order.size)
         if asset is None:
             return
 
@@ -115,68 +223,311 @@ class Platform:
         self._account_balance[order.user_id][asset].available -= reserve_amount
         self._account_balance[order.user_id][asset].reserved += reserve_amount
 
+    def _release_asset(self, order: Order):
+        """hand back the reservation for the unfilled part of an order"""
+        asset, release_amount = self._reservation(order, order.remaining)
+        if asset is None:
+            return
+
+        self._account_balance[order.user_id][asset].available += release_amount
+        self._account_balance[order.user_id][asset].reserved -= release_amount
+
     def add_order(self, order: Order) -> Order:
         with self.lock:
-            self._reserve_asset(order)
             try:
                 trading_engine = self.trading_engine[order.symbol]
             except KeyError:
                 raise UnrecognizedSymbol
 
-            if order.order_type == OrderType.limit_order:
-                order_trades = trading_engine.add_limit_order(order)
-            else:
+            if not isinstance(order, (LimitOrder, StopOrder)):
                 raise UnrecognizedOrderType
 
-            for order, trade in order_trades:
-                self._on_trade(order, trade)
+            now = self.clock()
+            self._canceled(trading_engine.expire_orders(now))
 
-            return Order
+            self._stamp(order, now)
 
-    def order_status(self, order_id: str, symbol: Optional[str] = None) -> Order:
+            self._reserve_asset(order)
+            order_trades = trading_engine.add_order(order, now)
+
+            for traded_order, trade in order_trades:
+                self._on_trade(traded_order, trade)
+
+            if self.listeners:
+                self._notify_order(order, order_trades)
+
+            self._canceled(trading_engine.take_canceled())
+            return order
+
+    def _stamp(self, order: Order, now: datetime) -> None:
+        """time an order from the platform clock, unless the caller timed it
+
+        queue priority compares create_time with the requeue times of amended
+        orders, and expiry compares expire_time with the clock, so all of them
+        have to be on the same clock
+        """
+        if "create_time" not in order.__fields_set__:
+            order.create_time = now
+        if order.ttl is not None and "expire_time" not in order.__fields_set__:
+            order.expire_time = order.create_time + order.ttl
+
+    def _notify_order(self, order: Order, order_trades: List[Tuple[Order, Trade]]):
+        # each trade appears once for the taker and once for the maker
+        trades = [trade for _order, trade in order_trades[::2]]
+        for listener in self.listeners:
+            listener.on_order(order)
+            for trade in trades:
+                listener.on_trade(trade)
+
+    def _canceled(self, orders: Iterable[Order]) -> None:
+        for order in orders:
+            self._release_asset(order)
+            for listener in self.listeners:
+                listener.on_cancel(order)
+
+    def expire_orders(self, now: Optional[datetime] = None) -> List[Order]:
+        """cancel good till date orders due by now, on every symbol
+
+        due orders are also expired by any add or cancel on their symbol, so
+        this is only needed to keep idle books up to date
+        """
+        now = now or self.clock()
+        expired = []
+        with self.lock:
+            for trading_engine in self.trading_engine.loaded().values():
+                expired.extend(trading_engine.expire_orders(now))
+            self._canceled(expired)
+        return expired
+
+    def _engines_for(self, symbol: Optional[str]) -> List[TradingEngine]:
+        # engines that were never created cannot hold any orders
         if symbol is None:
-            symbols = tuple(self.trading_engine.keys())
-        else:
-            symbols = tuple(symbol)
+            return list(self.trading_engine.loaded().values())
 
-        for symbol in symbols:
+        try:
+            return [self.trading_engine[symbol]]
+        except KeyError:
+            raise UnrecognizedSymbol
+
+    def order_status(self, order_id: str, symbol: Optional[str] = None) -> Order:
+        for trading_engine in self._engines_for(symbol):
             try:
-                return self.trading_engine[symbol].order_status(order_id)
+                return trading_engine.order_status(order_id)
             except OrderNotFound:
                 pass
         else:
             raise OrderNotFound
 
     def cancel_order(self, order_id, symbol: Optional[str] = None) -> Order:
-        if symbol is None:
-            symbols = tuple(self.trading_engine.keys())
-        else:
-            symbols = tuple(symbol)
+        with self.lock:
+            now = self.clock()
+            for trading_engine in self._engines_for(symbol):
+                self._canceled(trading_engine.expire_orders(now))
+                try:
+                    order = trading_engine.cancel_order(order_id, now)
+                except OrderNotFound:
+                    continue
+                self._canceled([order])
+                return order
+            else:
+                raise OrderNotFound
 
-        for symbol in symbols:
-            try:
-                return self.trading_engine[symbol].cancel_order(order_id)
-            except OrderNotFound:
-                pass
-        else:
-            raise OrderNotFound
+    def amend_order(
+        self,
+        order_id: str,
+        new_size: Optional[Decimal] = None,
+        new_price: Optional[Decimal] = None,
+        symbol: Optional[str] = None,
+    ) -> Order:
+        """change the size or limit price of an open order in one step
+
+        cutting the size keeps the order's place in the queue. A new price or
+        a larger size moves the order to the back of the queue at its price,
+        trading first if it now crosses, without it ever leaving the book
+        unlocked as a cancel and re-add would. The reservation is adjusted by
+        the difference.
+        """
+        if new_size is not None:
+            new_size = Decimal(str(new_size))
+        if new_price is not None:
+            new_price = Decimal(str(new_price))
+
+        with self.lock:
+            now = self.clock()
+            for trading_engine in self._engines_for(symbol):
+                self._canceled(trading_engine.expire_orders(now))
+                try:
+                    order = trading_engine.open_order(order_id)
+                except OrderNotFound:
+                    continue
+                break
+            else:
+                raise OrderNotFound
+
+            asset, held = self._reservation(order, order.remaining)
+            _, needed = self._reservation(
+                order,
+                (order.size if new_size is None else new_size) - order.dealt,
+                new_price,
+            )
+            if (
+                asset is not None
+                and self._account_balance[order.user_id][asset].available
+                < needed - held
+            ):
+                raise InsufficientBalance(asset)
+
+            order_trades = trading_engine.amend_order(
+                order_id, new_size, new_price, now
+            )
+
+            if asset is not None:
+                self._account_balance[order.user_id][asset].available -= needed - held
+                self._account_balance[order.user_id][asset].reserved += needed - held
+
+            for traded_order, trade in order_trades:
+                self._on_trade(traded_order, trade)
+
+            if self.listeners:
+                self._notify_order(order, order_trades)
+
+            self._canceled(trading_engine.take_canceled())
+            return order
 
     def cancel_all_orders(
         self, symbol: Optional[str] = None, user_id: Optional[str] = None
     ) -> List[Order]:
-        if symbol is None:
-            symbols = tuple(self.trading_engine.keys())
-        else:
-            symbols = tuple(symbol)
-
         canceled = []
-        for symbol in symbols:
-            canceled.append(self.trading_engine[symbol].cancel_order(user_id))
+        with self.lock:
+            now = self.clock()
+            for trading_engine in self._engines_for(symbol):
+                self._canceled(trading_engine.expire_orders(now))
+                canceled.extend(trading_engine.cancel_all(user_id, now))
+            self._canceled(canceled)
 
         return canceled
 
-    def order_book(self, symbol: str):
+    def order_book(self, symbol: str, depth: Optional[int] = None) -> OrderBook:
+        # the levels are read while other threads change them, so under the lock
+        with self.lock:
+            return self._expired_engine(symbol).order_book_snapshot(depth)
+
+    def order_book_json(self, symbol: str, depth: Optional[int] = None) -> bytes:
+        """order book as compact JSON bytes, Decimals as strings
+
+        encoded straight from the engine's levels and reused until the book
+        changes, so polling an unchanged book costs a lookup
+        """
+        with self.lock:
+            return self._expired_engine(symbol).order_book_json(depth)
+
+    def _expired_engine(self, symbol: str) -> TradingEngine:
+        # with the lock held
+        try:
+            trading_engine = self.trading_engine[symbol]
+        except KeyError:
+            raise UnrecognizedSymbol
+
+        next_expiry = trading_engine.next_expiry
+        if next_expiry is not None and next_expiry <= self.clock():
+            self._canceled(trading_engine.expire_orders(self.clock()))
+        return trading_engine
+
+    def quote(self, symbol: str, side: Side, size: Decimal) -> Quote:
+        """VWAP, worst price and levels for a market order on side for size
+
+        answered from cumulative depth, rather than by walking order_book;
+        unfilled is what the book is too thin for
+        """
+        size = Decimal(str(size))
+        with self.lock:
+            return self._expired_engine(symbol).quote(side, size)
+
+    def size_for_price(self, symbol: str, side: Side, limit_price: Decimal) -> Quote:
+        """how much an order on side at limit_price would fill at once"""
+        limit_price = Decimal(str(limit_price))
+        with self.lock:
+            return self._expired_engine(symbol).size_for_price(side, limit_price)
+
+    def order_book_arrays(self, symbol: str, depth: Optional[int] = None) -> BookArrays:
+        """order book as float64 price/quantity arrays per side, best first
+
+        requires numpy
+        """
+        try:
+            trading_engine = self.trading_engine[symbol]
+        except KeyError:
+            raise UnrecognizedSymbol
+
+        with self.lock:
+            return arrays.book_arrays(trading_engine, depth)
+
+    def trade_tape(
+        self,
+        symbol: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        """trades in [since, until) as a numpy structured array of TRADE_FIELDS
+
+        requires numpy
+        """
         try:
-            return self.trading_engine[symbol].order_book
+            trading_engine = self.trading_engine[symbol]
         except KeyError:
             raise UnrecognizedSymbol
+
+        with self.lock:
+            return arrays.trade_tape(trading_engine.trade_index, since, until)
+
+    def trades(
+        self,
+        symbol: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[int] = None,
+    ) -> TradePage:
+        """trades on symbol in [since, until), oldest first
+
+        pass the returned next_cursor back to fetch the following page; cursors
+        stay valid as new trades are added
+        """
+        try:
+            trading_engine = self.trading_engine[symbol]
+        except KeyError:
+            raise UnrecognizedSymbol
+
+        with self.lock:
+            return trading_engine.trade_index.page(since, until, limit, cursor)
+
+    def my_trades(
+        self,
+        user_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[int] = None,
+    ) -> TradePage:
+        """trades, across all symbols, in which user_id had an order filled"""
+        with self.lock:
+            user_trades = self._user_trades.get(user_id)
+            if user_trades is None:
+                return TradePage(trades=[], next_cursor=cursor)
+            return user_trades.page(since, until, limit, cursor)
+
+    def candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Candle]:
+        """candles opening in [start, end), oldest first, including the current one"""
+        try:
+            trading_engine = self.trading_engine[symbol]
+        except KeyError:
+            raise UnrecognizedSymbol
+
+        with self.lock:
+            return trading_engine.candles.candles(interval, start, end)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import List, Optional
 
 from pydantic.fields import Field
 from pydantic.main import BaseModel
@@ -13,3 +14,19 @@ class Trade(BaseModel):
     amount: Decimal
     timestamp: datetime = Field(default_factory=datetime.utcnow())
     trade_id: str = Field(default_factory=uuid_hex)
+    symbol: Optional[str] = None
+    sequence: Optional[int] = Field(
+        default=None, description="platform-wide, increasing in execution order"
+    )
+    taker_side: Optional[str] = None
+    taker_order_id: Optional[str] = None
+    maker_order_id: Optional[str] = None
+
+
+@static_check_init_args
+class TradePage(BaseModel):
+    trades: List[Trade]
+    next_cursor: Optional[int] = Field(
+        default=None, description="pass back as cursor to continue after this page"
+    )
+    has_more: bool = False
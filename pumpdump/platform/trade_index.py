@@ -0,0 +1,99 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List, Optional
+
+from .candles import epoch_seconds
+from .trade import Trade, TradePage
+
+
+def _micros(timestamp: datetime) -> int:
+    return round(epoch_seconds(timestamp) * 1_000_000)
+
+
+class TradeIndex:
+    """append-only trades ordered by sequence, searchable by time
+
+    trade timestamps come from the taker order and are not strictly increasing,
+    so trades are bisected on the latest timestamp seen so far, which is sorted.
+    A trade's own timestamp is at most lag behind that, so only the trades
+    within lag of either end of a query are checked against their own.
+    """
+
+    def __init__(self) -> None:
+        self._sequences: List[int] = []
+        # latest timestamp so far, and each trade's own, in epoch microseconds
+        self._times: List[int] = []
+        self._own_times: List[int] = []
+        self._lag = 0
+        self._trades: List[Trade] = []
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    @property
+    def last_sequence(self) -> Optional[int]:
+        return self._sequences[-1] if self._sequences else None
+
+    def append(self, trade: Trade) -> None:
+        time = _micros(trade.timestamp)
+        latest = max(time, self._times[-1]) if self._times else time
+        self._lag = max(self._lag, latest - time)
+        self._sequences.append(trade.sequence)
+        self._times.append(latest)
+        self._own_times.append(time)
+        self._trades.append(trade)
+
+    def _indices(
+        self, since: Optional[datetime], until: Optional[datetime], start: int = 0
+    ) -> Iterator[int]:
+        """positions from start on of trades in [since, until), in order"""
+        lo, hi = start, len(self._trades)
+        # trades before checked_lo or from checked_hi on need their own
+        # timestamps checking
+        checked_lo, checked_hi = lo, hi
+        if since is not None:
+            since_time = _micros(since)
+            lo = max(lo, bisect_left(self._times, since_time))
+            checked_lo = bisect_left(self._times, since_time + self._lag, lo)
+        if until is not None:
+            until_time = _micros(until)
+            checked_hi = bisect_left(self._times, until_time, lo)
+            hi = bisect_left(self._times, until_time + self._lag, checked_hi)
+
+        own_times = self._own_times
+        for i in range(lo, min(checked_lo, hi)):
+            if own_times[i] >= since_time and (
+                i < checked_hi or own_times[i] < until_time
+            ):
+                yield i
+        yield from range(checked_lo, checked_hi)
+        for i in range(max(checked_lo, checked_hi), hi):
+            if own_times[i] < until_time:
+                yield i
+
+    def between(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[Trade]:
+        trades = self._trades
+        return [trades[i] for i in self._indices(since, until)]
+
+    def page(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[int] = None,
+    ) -> TradePage:
+        """trades in [since, until) after cursor, oldest first"""
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+
+        start = 0 if cursor is None else bisect_right(self._sequences, cursor)
+        indices = list(islice(self._indices(since, until, start), limit + 1))
+        trades = [self._trades[i] for i in indices[:limit]]
+        return TradePage(
+            trades=trades,
+            next_cursor=trades[-1].sequence if trades else cursor,
+            has_more=len(indices) > limit,
+        )
@@ -1,117 +1,283 @@
+import bisect
+import heapq
+import itertools
+import math
 import threading
-from collections import defaultdict
+from collections import deque
 from datetime import datetime
-from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Union
+from decimal import ROUND_DOWN, Decimal
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from sortedcontainers import SortedList
+from sortedcontainers import SortedDict, SortedList
 
-from pumpdump import PlatformConfig, default_config
+from pumpdump import encoding
+from pumpdump._config import PlatformConfig, default_config
 
+from .candles import CandleAggregator
 from .exceptions import (
+    InvalidAmendment,
     InvalidPricePrecision,
     InvalidSizePrecision,
     OrderAlreadyCanceled,
     OrderAlreadyCompleted,
     OrderNotFound,
     OrderTooSmall,
+    UnrecognizedOrderType,
+)
+from .order import (
+    InvalidSideException,
+    LimitOrder,
+    Order,
+    PricedOrder,
+    Side,
+    StopOrder,
+    TimeInForce,
 )
-from .order import InvalidSideException, LimitOrder, Order, PricedOrder, Side
-from .order_book import OrderBook, PriceLevel
+from .order_book import OrderBook, PriceLevel, Quote
 from .trade import Trade
+from .trade_index import TradeIndex
+
+# distinct depths to keep encoded books for
+_MAX_ENCODED_BOOKS = 16
+
+
+class _BookSide:
+    """resting orders on one side in priority order, plus aggregated levels
 
+    orders are keyed (sign * price, requeued or create_time, arrival, order_id)
+    so that the best price sorts first on both sides, and orders at the same
+    price and time queue in the order they rested; levels map sign * price to
+    [quantity, order count] and are kept up to date as orders rest, fill and
+    are removed, so the book never has to be rebuilt from individual orders.
+    version counts the changes to levels.
+    """
+
+    sign: int
 
-class Bids:
     def __init__(self, open_orders: Dict[str, PricedOrder]) -> None:
         self.open_orders = open_orders
-        self.bids = SortedList(
-            (-o.price, o.create_time, o.order_id) for o in open_orders.values()
-        )
+        self.orders = SortedList()
+        self._keys: Dict[str, tuple] = {}
+        self._arrival = itertools.count()
+        self.levels = SortedDict()
+        self.version = 0
+        self._cumulative: Optional[Tuple[int, Tuple[List, List, List]]] = None
 
     def pop(self) -> PricedOrder:
-        _, _create_time, order_id = self.bids.pop(0)
-        return self.open_orders[order_id]
+        order_id = self.orders.pop(0)[-1]
+        del self._keys[order_id]
+        order = self.open_orders[order_id]
+        self._leave_level(order)
+        return order
 
     @property
     def best(self) -> Optional[PricedOrder]:
         try:
-            _, _create_time, order_id = self.bids[0]
-            return self.open_orders[order_id]
+            return self.open_orders[self.orders[0][-1]]
         except IndexError:
             return None
 
     def insert(self, order: PricedOrder):
-        self.bids.add((-order.price, order.create_time, order.order_id))
+        key = (
+            self.sign * order.price,
+            order.requeued or order.create_time,
+            next(self._arrival),
+            order.order_id,
+        )
+        self.orders.add(key)
+        self._keys[order.order_id] = key
         self.open_orders[order.order_id] = order
+        self.version += 1
 
-    @property
-    def book(self) -> List[PriceLevel]:
-        # TODO: optimize if needed
-        bid_book = defaultdict(Decimal)
-        for _, _create_time, order_id in self.bids:
-            order = self.open_orders[order_id]
-            bid_book[order.price] += order.remaining
+        level = self.levels.get(self.sign * order.price)
+        if level is None:
+            self.levels[self.sign * order.price] = [order.remaining, 1]
+        else:
+            level[0] += order.remaining
+            level[1] += 1
+
+    def fill(self, order: PricedOrder, amount: Decimal):
+        """a resting order traded amount"""
+        self.levels[self.sign * order.price][0] -= amount
+        self.version += 1
+
+    def shrink(self, order: PricedOrder, amount: Decimal):
+        """a resting order's size was cut by amount, keeping its place"""
+        self.levels[self.sign * order.price][0] -= amount
+        self.version += 1
+
+    def _leave_level(self, order: PricedOrder, remaining: Decimal = Decimal(0)):
+        key = self.sign * order.price
+        level = self.levels[key]
+        self.version += 1
+        level[1] -= 1
+        if level[1] == 0:
+            del self.levels[key]
+        else:
+            level[0] -= remaining
 
+    def book(self, depth: Optional[int] = None) -> List[PriceLevel]:
         return [
-            PriceLevel(price=p, quantity=q)
-            for p, q in sorted(tuple(bid_book.items()), reverse=True)
+            PriceLevel(price=price, quantity=quantity)
+            for price, quantity in self.price_quantities(depth)
         ]
 
+    def price_quantities(self, depth: Optional[int] = None) -> Iterator[Tuple]:
+        """(price, quantity) of each level, best first"""
+        sign = self.sign
+        for key, (quantity, _count) in itertools.islice(self.levels.items(), depth):
+            yield sign * key, quantity
+
     def remove(self, order: PricedOrder):
-        self.bids.remove((-order.price, order.create_time, order.order_id))
+        self.orders.remove(self._keys.pop(order.order_id))
+        self._leave_level(order, order.remaining)
+
+    def cumulative(self) -> Tuple[List[Decimal], List[Decimal], List[Decimal]]:
+        """level keys, and the quantity and notional of each level and all
+        better ones, best first
+
+        rebuilt the first time they are asked for after the levels change
+        """
+        if self._cumulative is None or self._cumulative[0] != self.version:
+            keys = list(self.levels.keys())
+            quantities = [quantity for quantity, _count in self.levels.values()]
+            notionals = [
+                self.sign * key * quantity for key, quantity in zip(keys, quantities)
+            ]
+            self._cumulative = (
+                self.version,
+                (
+                    keys,
+                    list(itertools.accumulate(quantities)),
+                    list(itertools.accumulate(notionals)),
+                ),
+            )
+        return self._cumulative[1]
+
+    def can_fill(self, order: Order) -> bool:
+        """whether the levels that order crosses hold its remaining size"""
+        if isinstance(order, PricedOrder):
+            keys = self.levels.irange(maximum=self.sign * order.price)
+        else:
+            keys = self.levels.keys()
 
+        needed = order.remaining
+        for key in keys:
+            needed -= self.levels[key][0]
+            if needed <= 0:
+                return True
+        return False
 
-class Asks:
-    def __init__(self, open_orders: Dict[str, PricedOrder]) -> None:
-        self.open_orders = open_orders
-        self.asks = SortedList(
-            (o.price, o.create_time, o.order_id) for o in open_orders.values()
-        )
 
-    def pop(self) -> PricedOrder:
-        _, _create_time, order_id = self.asks.pop(0)
-        return self.open_orders[order_id]
+class Bids(_BookSide):
+    sign = -1
 
-    @property
-    def best(self) -> Optional[PricedOrder]:
-        try:
-            _, _create_time, order_id = self.asks[0]
-            return self.open_orders[order_id]
-        except IndexError:
-            return None
 
-    def insert(self, order: PricedOrder):
-        self.asks.add((order.price, order.create_time, order.order_id))
-        self.open_orders[order.order_id] = order
+class Asks(_BookSide):
+    sign = 1
 
-    @property
-    def book(self) -> List[PriceLevel]:
-        # TODO: optimize if needed
-        ask_book = defaultdict(Decimal)
-        for _, _create_time, order_id in self.asks:
-            order = self.open_orders[order_id]
-            ask_book[order.price] += order.remaining
 
-        return [
-            PriceLevel(price=p, quantity=q) for p, q in sorted(tuple(ask_book.items()))
-        ]
+class _TriggerSide:
+    """pending stop orders on one side, keyed (sign * stop_price, arrival, order_id)
 
-    def remove(self, order: PricedOrder):
-        self.asks.remove((order.price, order.create_time, order.order_id))
+    buy stops trigger at or above their stop price and sell stops at or below
+    it, so with the sign applied the triggered orders are always a prefix of
+    the index and can be cut off without looking at the rest.
+    """
+
+    sign: int
+
+    def __init__(self, stop_orders: Dict[str, StopOrder]) -> None:
+        self.stop_orders = stop_orders
+        self.orders = SortedList()
+        self._keys: Dict[str, tuple] = {}
+
+    def insert(self, order: StopOrder, arrival: int) -> None:
+        key = (self.sign * order.stop_price, arrival, order.order_id)
+        self.orders.add(key)
+        self._keys[order.order_id] = key
+        self.stop_orders[order.order_id] = order
+
+    def remove(self, order: StopOrder) -> None:
+        self.orders.remove(self._keys.pop(order.order_id))
+        del self.stop_orders[order.order_id]
+
+    def pop_triggered(self, price: Decimal) -> List[tuple]:
+        """remove and return the keys of the orders a trade at price triggers"""
+        end = self.orders.bisect_right((self.sign * price, math.inf))
+        if not end:
+            return []
+        keys = self.orders[:end]
+        del self.orders[:end]
+        for _, _arrival, order_id in keys:
+            del self._keys[order_id]
+        return keys
+
+
+class BuyStops(_TriggerSide):
+    sign = 1
+
+
+class SellStops(_TriggerSide):
+    sign = -1
 
 
 class TradingEngine:
-    def __init__(self, symbol, config: Optional[PlatformConfig] = None) -> None:
+    def __init__(
+        self,
+        symbol,
+        config: Optional[PlatformConfig] = None,
+        sequence: Optional[Iterator[int]] = None,
+        funds: Optional[Callable[[Order], Optional[Decimal]]] = None,
+    ) -> None:
+        """
+        funds: what the owner of an order with no price has available to
+            trade with when it triggers, quote for a buy and base for a sell,
+            or None if it is not limited
+        """
         self.config = config or default_config
         self.symbol = symbol
+        self.funds = funds
+
+        # shared between engines by Platform so trade sequences are global
+        self._sequence = sequence or itertools.count(1)
 
         self._open_orders: Dict[str, Order] = {}
         self._trades: List[Trade] = []
+        self.trade_index = TradeIndex()
         self._completed_orders: Dict[str, Order] = {}
 
         self._bids = Bids(self._open_orders)
         self._asks = Asks(self._open_orders)
 
+        self._stop_orders: Dict[str, StopOrder] = {}
+        self._buy_stops = BuyStops(self._stop_orders)
+        self._sell_stops = SellStops(self._stop_orders)
+        self._arrival = itertools.count()
+
+        # (expire_time, arrival, order_id) of good till date orders; entries
+        # for orders that have since filled or been canceled are skipped when
+        # they come due
+        self._expiries: List[Tuple[datetime, int, str]] = []
+        # canceled by the engine rather than by cancel_order, see take_canceled
+        self._canceled: List[Order] = []
+
+        # depth -> (book_version, encoded book), see order_book_json
+        self._encoded_books: Dict[Optional[int], Tuple[int, bytes]] = {}
+
+        self.candles = CandleAggregator(
+            symbol, self.config.candle_intervals, self.config.max_candles
+        )
+
         self.lock = threading.Lock()
 
     @property
@@ -137,10 +303,102 @@ class TradingEngine:
 
     @property
     def order_book(self):
-        return OrderBook(symbol=self.symbol, bids=self._bids.book, asks=self._asks.book)
+        return self.order_book_snapshot()
+
+    def order_book_snapshot(self, depth: Optional[int] = None) -> OrderBook:
+        return OrderBook(
+            symbol=self.symbol, bids=self._bids.book(depth), asks=self._asks.book(depth)
+        )
+
+    @property
+    def book_version(self) -> int:
+        """changes to the book so far; the same version is the same book"""
+        return self._bids.version + self._asks.version
+
+    def order_book_json(self, depth: Optional[int] = None) -> bytes:
+        """order_book_snapshot(depth) as compact JSON, see encoding
+
+        the encoding is kept until the book next changes, so repeated calls
+        return the same bytes, timestamp included
+        """
+        version = self.book_version
+        cached = self._encoded_books.get(depth)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        encoded = encoding.encode_book(
+            self.symbol,
+            self._bids.price_quantities(depth),
+            self._asks.price_quantities(depth),
+        )
+        if len(self._encoded_books) >= _MAX_ENCODED_BOOKS:
+            self._encoded_books.clear()
+        self._encoded_books[depth] = (version, encoded)
+        return encoded
+
+    def _match_side(self, side: Side) -> _BookSide:
+        if side == Side.buy:
+            return self._asks
+        elif side == Side.sell:
+            return self._bids
+        raise InvalidSideException
+
+    def _quote(self, side: Side, book_side: _BookSide, levels: int, size) -> Quote:
+        """the first levels of book_side, the last of them only as far as size"""
+        if levels == 0:
+            return Quote(
+                symbol=self.symbol,
+                side=side,
+                size=0,
+                notional=0,
+                levels=0,
+                unfilled=size or 0,
+            )
+
+        keys, quantities, notionals = book_side.cumulative()
+        worst_price = book_side.sign * keys[levels - 1]
+        filled = quantities[levels - 1]
+        notional = notionals[levels - 1]
+        unfilled = Decimal(0)
+        if size is not None and size < filled:
+            notional -= (filled - size) * worst_price
+            filled = size
+        elif size is not None:
+            unfilled = size - filled
+
+        return Quote(
+            symbol=self.symbol,
+            side=side,
+            size=filled,
+            notional=notional,
+            vwap=notional / filled,
+            worst_price=worst_price,
+            levels=levels,
+            unfilled=unfilled,
+        )
+
+    def quote(self, side: Side, size: Decimal) -> Quote:
+        """what a market order on side for size would fill, in O(log levels)"""
+        if size <= 0:
+            raise ValueError("size must be greater than zero")
+        book_side = self._match_side(side)
+        _keys, quantities, _notionals = book_side.cumulative()
+        levels = min(bisect.bisect_left(quantities, size) + 1, len(quantities))
+        return self._quote(side, book_side, levels, size)
+
+    def size_for_price(self, side: Side, limit_price: Decimal) -> Quote:
+        """what an order on side at limit_price would fill, in O(log levels)"""
+        book_side = self._match_side(side)
+        keys, _quantities, _notionals = book_side.cumulative()
+        levels = bisect.bisect_right(keys, book_side.sign * limit_price)
+        return self._quote(side, book_side, levels, None)
 
     def order_status(self, order_id):
-        order = self._open_orders.get(order_id) or self._completed_orders.get(order_id)
+        order = (
+            self._open_orders.get(order_id)
+            or self._stop_orders.get(order_id)
+            or self._completed_orders.get(order_id)
+        )
         if not order:
             raise OrderNotFound
 
@@ -154,45 +412,266 @@ class TradingEngine:
         if order.price.quantize(self.size_tick) != order.price:
             raise InvalidPricePrecision
 
-    def add_limit_order(self, order: LimitOrder) -> List[Tuple[Order, Trade]]:
+    def add_order(
+        self, order: Order, now: Optional[datetime] = None
+    ) -> List[Tuple[Order, Trade]]:
+        """match or rest order
+
+        now, the current time by default, stamps the cancel of whatever the
+        engine cancels of order or of the stops it triggers
+        """
+        if isinstance(order, StopOrder):
+            return self.add_stop_order(order, now)
+        if isinstance(order, LimitOrder):
+            return self.add_limit_order(order, now)
+        raise UnrecognizedOrderType
+
+    def add_limit_order(
+        self, order: LimitOrder, now: Optional[datetime] = None
+    ) -> List[Tuple[Order, Trade]]:
+        now = now or datetime.utcnow()
+        order_trades = self._execute(order, now)
+        if order_trades and self._stop_orders:
+            self._run_stops(order_trades, now)
+        return order_trades
+
+    def add_stop_order(
+        self, order: StopOrder, now: Optional[datetime] = None
+    ) -> List[Tuple[Order, Trade]]:
+        """rest a stop order, or trigger it straight away if the last trade
+        price is already through its stop price"""
+        arrival = next(self._arrival)
         if order.side == Side.buy:
-            match_against = self._asks
-            insert_into = self._bids
+            self._buy_stops.insert(order, arrival)
         elif order.side == Side.sell:
-            match_against = self._bids
-            insert_into = self._asks
+            self._sell_stops.insert(order, arrival)
         else:
             raise InvalidSideException
+        if order.expire_time is not None:
+            heapq.heappush(self._expiries, (order.expire_time, arrival, order.order_id))
+
+        order_trades: List[Tuple[Order, Trade]] = []
+        if self._trades:
+            self._run_stops(order_trades, now or datetime.utcnow(), self._trades[-1:])
+        return order_trades
+
+    def _run_stops(
+        self,
+        order_trades: List[Tuple[Order, Trade]],
+        now: datetime,
+        trades: Optional[List[Trade]] = None,
+    ) -> None:
+        """execute the stops that trades trigger, then the stops that those
+        trade into, and so on, appending to order_trades
+
+        each round of triggered orders executes in the order the stops were
+        added, after any triggered in earlier rounds
+        """
+        if trades is None:
+            trades = [trade for _order, trade in order_trades[::2]]
+        queue: Deque[StopOrder] = deque()
+        # (user_id, side) -> funds taken by earlier orders in this cascade,
+        # which the owner's balance does not show until it is settled
+        spent: Dict[Tuple[Optional[str], str], Decimal] = {}
+
+        while True:
+            if trades:
+                high = max(trade.price for trade in trades)
+                low = min(trade.price for trade in trades)
+                keys = self._buy_stops.pop_triggered(high)
+                keys.extend(self._sell_stops.pop_triggered(low))
+                keys.sort(key=lambda key: key[1])
+                for _, _arrival, order_id in keys:
+                    order = self._stop_orders.pop(order_id)
+                    order.triggered = trades[-1].timestamp
+                    queue.append(order)
+
+            if not queue:
+                return
+
+            executed = self._execute(queue.popleft(), now, spent)
+            order_trades.extend(executed)
+            trades = [trade for _order, trade in executed[::2]]
+
+    def _execute(
+        self,
+        order: Order,
+        now: datetime,
+        spent: Optional[Dict[Tuple[Optional[str], str], Decimal]] = None,
+    ) -> List[Tuple[Order, Trade]]:
+        """match order against the book, resting what is left of a priced
+        good till canceled or date order and canceling what is left of any
+        other
+
+        an order with no price trades only as far as its owner's funds, less
+        what spent records, go
+        """
+        match_against = self._match_side(order.side)
+        insert_into = self._bids if match_against is self._asks else self._asks
 
         order_trades: List[Tuple[Order, Trade]] = []
+        if spent is None:
+            spent = {}
+        budget = self._budget(order, spent)
+
+        if order.time_in_force == TimeInForce.fok and not self._can_fill(
+            order, match_against, budget
+        ):
+            self._cancel_unfilled(order, now)
+            return order_trades
 
         while True:
             best_match = match_against.best
             if best_match is None:
-                insert_into.insert(order)
-                return order_trades
-            trade = self._match_limit_order(order, best_match)
+                trade = None
+            else:
+                trade = self._match_limit_order(
+                    order, best_match, self._affordable(order, best_match, budget)
+                )
             if not trade:
-                insert_into.insert(order)
+                self._rest_or_cancel(order, insert_into, now)
                 return order_trades
 
-            order.trades.append(trade)
-            best_match.trades.append(trade)
-            self._trades.append(trade)
+            self._record_trade(order, best_match, match_against, trade)
             order_trades.append((order, trade))
             order_trades.append((best_match, trade))
+            if budget is not None:
+                budget -= self._spend(order, trade, spent)
 
             if best_match.completed:
                 match_against.pop()
+                self._complete(best_match)
             if order.completed:
+                self._completed_orders[order.order_id] = order
                 return order_trades
 
-    def cancel_order(self, order_id: str) -> Order:
-        try:
-            order = self._open_orders.pop(order_id)
-            order.canceled = datetime.utcnow()
-            self._completed_orders[order_id] = order
-        except KeyError:
+    def _rest_or_cancel(
+        self, order: Order, insert_into: _BookSide, now: datetime
+    ) -> None:
+        """what is left of an order once it stops matching"""
+        if isinstance(order, PricedOrder) and order.time_in_force in (
+            TimeInForce.gtc,
+            TimeInForce.gtd,
+        ):
+            self._rest(order, insert_into)
+        else:
+            self._cancel_unfilled(order, now)
+
+    def _record_trade(
+        self,
+        order: Order,
+        maker_order: PricedOrder,
+        match_against: _BookSide,
+        trade: Trade,
+    ) -> None:
+        order.trades.append(trade)
+        maker_order.trades.append(trade)
+        match_against.fill(maker_order, trade.amount)
+        self._trades.append(trade)
+        self.trade_index.append(trade)
+        self.candles.on_trade(trade)
+
+    def _can_fill(
+        self, order: Order, match_against: _BookSide, budget: Optional[Decimal]
+    ) -> bool:
+        """whether all of a fill or kill order can trade at once"""
+        return match_against.can_fill(order) and (
+            budget is None or self._cost(order, order.remaining) <= budget
+        )
+
+    def _spend(
+        self,
+        order: Order,
+        trade: Trade,
+        spent: Dict[Tuple[Optional[str], str], Decimal],
+    ) -> Decimal:
+        """charge a trade by an order with no price to its owner's spent"""
+        cost = trade.amount
+        if order.side == Side.buy:
+            cost *= trade.price
+        key = (order.user_id, order.side.value)
+        spent[key] = spent.get(key, Decimal(0)) + cost
+        return cost
+
+    def _budget(
+        self, order: Order, spent: Dict[Tuple[Optional[str], str], Decimal]
+    ) -> Optional[Decimal]:
+        if isinstance(order, PricedOrder) or self.funds is None:
+            return None
+        funds = self.funds(order)
+        if funds is None:
+            return None
+        return funds - spent.get((order.user_id, order.side.value), Decimal(0))
+
+    def _cost(self, order: Order, size: Decimal) -> Decimal:
+        """what filling size of order from the book takes from its owner"""
+        if order.side == Side.sell:
+            return size
+        return self.quote(order.side, size).notional
+
+    def _affordable(
+        self, order: Order, maker_order: PricedOrder, budget: Optional[Decimal]
+    ) -> Optional[Decimal]:
+        """the most of maker_order that budget pays for, in size ticks"""
+        if budget is None:
+            return None
+        if order.side == Side.sell:
+            return budget
+        return (budget / maker_order.price).quantize(self.size_tick, ROUND_DOWN)
+
+    def _rest(self, order: PricedOrder, insert_into: _BookSide) -> None:
+        insert_into.insert(order)
+        # stops are scheduled to expire when they are added, and requeued
+        # orders when they first rested
+        if (
+            order.expire_time is not None
+            and order.requeued is None
+            and not isinstance(order, StopOrder)
+        ):
+            heapq.heappush(
+                self._expiries,
+                (order.expire_time, next(self._arrival), order.order_id),
+            )
+
+    def _cancel_unfilled(self, order: Order, now: datetime) -> None:
+        order.canceled = getattr(order, "triggered", None) or now
+        self._completed_orders[order.order_id] = order
+        self._canceled.append(order)
+
+    def take_canceled(self) -> List[Order]:
+        """orders canceled by the engine itself since the last call
+
+        the unfilled part of immediate or cancel, fill or kill and stop market
+        orders, including stops triggered by other orders
+        """
+        canceled, self._canceled = self._canceled, []
+        return canceled
+
+    @property
+    def next_expiry(self) -> Optional[datetime]:
+        """the earliest expire_time still pending, or possibly earlier"""
+        return self._expiries[0][0] if self._expiries else None
+
+    def expire_orders(self, now: datetime) -> List[Order]:
+        """cancel good till date orders whose expire_time is not after now"""
+        expired: List[Order] = []
+        expiries = self._expiries
+        while expiries and expiries[0][0] <= now:
+            expire_time, _arrival, order_id = heapq.heappop(expiries)
+            order = self._open_orders.get(order_id) or self._stop_orders.get(order_id)
+            if order is not None:
+                self._cancel(order, expire_time)
+                expired.append(order)
+        return expired
+
+    def _complete(self, order: Order) -> None:
+        del self._open_orders[order.order_id]
+        self._completed_orders[order.order_id] = order
+
+    def open_order(self, order_id: str) -> Order:
+        """a resting order or pending stop, raising if it is no longer open"""
+        order = self._open_orders.get(order_id) or self._stop_orders.get(order_id)
+        if order is None:
             if order_id in self._completed_orders:
                 order = self._completed_orders[order_id]
                 if order.canceled:
@@ -203,22 +682,111 @@ class TradingEngine:
             else:
                 raise OrderNotFound
 
-    def cancel_all(self, user_id: Optional[str] = None) -> List[Order]:
+        return order
+
+    def cancel_order(self, order_id: str, now: Optional[datetime] = None) -> Order:
+        order = self.open_order(order_id)
+        self._cancel(order, now or datetime.utcnow())
+        return order
+
+    def amend_order(
+        self,
+        order_id: str,
+        size: Optional[Decimal] = None,
+        price: Optional[Decimal] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[Order, Trade]]:
+        """change the size or limit price of an open order
+
+        cutting the size keeps the order's place in the queue; a new price or a
+        larger size moves it to the back of the queue at its price as of now,
+        trading first if it now crosses. Pending stops are changed in place.
+        """
+        order = self.open_order(order_id)
+        if size is None:
+            size = order.size
+        if price is None:
+            price = getattr(order, "price", None)
+        elif not isinstance(order, PricedOrder):
+            raise InvalidAmendment("order has no price")
+        if size <= order.dealt:
+            raise InvalidAmendment("size must be more than has been dealt")
+        if price is not None and price <= 0:
+            raise InvalidAmendment("price must be greater than zero")
+
+        if order_id in self._stop_orders:
+            order.size = size
+            if price is not None:
+                order.price = price
+            return []
+
+        book_side = self._bids if order.side == Side.buy else self._asks
+        if price == order.price and size <= order.size:
+            book_side.shrink(order, order.size - size)
+            order.size = size
+            return []
+
+        book_side.remove(order)
+        del self._open_orders[order_id]
+        order.size = size
+        order.price = price
+        order.requeued = now = now or datetime.utcnow()
+        return self.add_limit_order(order, now)
+
+    def _cancel(self, order: Order, when: datetime) -> None:
+        if order.order_id in self._stop_orders:
+            if order.side == Side.buy:
+                self._buy_stops.remove(order)
+            else:
+                self._sell_stops.remove(order)
+            self._completed_orders[order.order_id] = order
+        else:
+            if order.side == Side.buy:
+                self._bids.remove(order)
+            else:
+                self._asks.remove(order)
+            self._complete(order)
+        order.canceled = when
+
+    def cancel_all(
+        self, user_id: Optional[str] = None, now: Optional[datetime] = None
+    ) -> List[Order]:
+        now = now or datetime.utcnow()
         return [
-            self.cancel_order(order_id)
-            for order_id, order in tuple(self._open_orders.items())
+            self.cancel_order(order_id, now)
+            for orders in (self._stop_orders, self._open_orders)
+            for order_id, order in tuple(orders.items())
             if order.user_id == user_id
         ]
 
     def _match_limit_order(
-        self, taker_order: PricedOrder, maker_order: PricedOrder
+        self,
+        taker_order: PricedOrder,
+        maker_order: PricedOrder,
+        max_amount: Optional[Decimal] = None,
     ) -> Optional[Trade]:
-        """match two limit orders"""
-        if taker_order.side * taker_order.price < taker_order.side * maker_order.price:
+        """match a taker against a resting limit order, at any price if the
+        taker has none, for no more than max_amount"""
+        if isinstance(taker_order, PricedOrder) and (
+            taker_order.side * taker_order.price < taker_order.side * maker_order.price
+        ):
             return None
 
+        amount = min(maker_order.remaining, taker_order.remaining)
+        if max_amount is not None and max_amount < amount:
+            if max_amount <= 0:
+                return None
+            amount = max_amount
+
         return Trade(
-            amount=min(maker_order.remaining, taker_order.remaining),
+            amount=amount,
             price=maker_order.price,
-            timestamp=taker_order.create_time,
+            timestamp=taker_order.requeued
+            or getattr(taker_order, "triggered", None)
+            or taker_order.create_time,
+            symbol=self.symbol,
+            sequence=next(self._sequence),
+            taker_side=taker_order.side,
+            taker_order_id=taker_order.order_id,
+            maker_order_id=maker_order.order_id,
         )
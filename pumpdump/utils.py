@@ -1,18 +1,56 @@
 import random
 from decimal import Decimal
+from typing import Optional, Tuple
 
 from pumpdump.platform.order import LimitOrder
 from pumpdump.platform.platform import Platform
 
 
-# TODO: change to actor
 def _constant_product_quote(
     source_asset_amount: float,
     source_asset_reserve: float,
     dest_asset_reserve: float,
 ) -> float:
-    k = source_asset_reserve * dest_asset_reserve
-    return dest_asset_reserve - k / (source_asset_reserve + source_asset_amount)
+    # dest - k / (source + amount), rearranged so that small amounts against
+    # large reserves do not cancel out
+    return (
+        dest_asset_reserve
+        * source_asset_amount
+        / (source_asset_reserve + source_asset_amount)
+    )
+
+
+def _initial_reserves(
+    starting_price: Optional[Decimal],
+    base_reserve: Optional[Decimal],
+    quote_reserve: Optional[Decimal],
+    rng: random.Random,
+) -> Tuple[float, float]:
+    """base and quote reserves from any two of the three, random otherwise"""
+    if (
+        starting_price is not None
+        and base_reserve is not None
+        and quote_reserve is not None
+    ):
+        raise ValueError("cannot specify all starting_price base_reserve quote_reserve")
+
+    # the ladder is computed in floats
+    starting_price, base_reserve, quote_reserve = (
+        float(v) if v is not None else None
+        for v in (starting_price, base_reserve, quote_reserve)
+    )
+
+    if base_reserve is None and quote_reserve is not None and starting_price:
+        base_reserve = quote_reserve / starting_price
+    elif base_reserve is None:
+        base_reserve = rng.random() * (10 ** rng.uniform(4, 10))
+
+    if quote_reserve is None and starting_price is None:
+        quote_reserve = rng.random() * (10 ** rng.uniform(4, 10))
+    elif quote_reserve is None:
+        quote_reserve = base_reserve * starting_price
+
+    return base_reserve, quote_reserve
 
 
 def generate_constant_product_book(
@@ -24,19 +62,15 @@ def generate_constant_product_book(
     quote_reserve: Decimal = None,
     levels: int = 30,
     fee: Decimal = Decimal("0.001"),
+    rng: random.Random = None,
 ) -> None:
-    if (
-        starting_price is not None
-        and base_reserve is not None
-        and quote_reserve is not None
-    ):
-        raise ValueError("cannot specify all starting_price base_reserve quote_reserve")
+    """rest a one-off constant product ladder
 
-    if base_reserve is None:
-        base_reserve = random.random() * (10 ** random.uniform(4, 10))
-
-    if quote_reserve is None and starting_price is None:
-        quote_reserve = random.random() * (10 ** random.uniform(4, 10))
+    see actor.constant_product.ConstantProductMaker for one kept up to date
+    """
+    base_reserve, quote_reserve = _initial_reserves(
+        starting_price, base_reserve, quote_reserve, rng or random
+    )
 
     approx_level_size_scaling = 100 ** (1 / 30)
 
@@ -49,7 +83,7 @@ def generate_constant_product_book(
 
     for _ in range(levels):
         quote_amount = _constant_product_quote(order_size, base_reserve, quote_reserve)
-        buy_price = quote_amount / order_size * (1 + fee)
+        buy_price = quote_amount / order_size * (1 - fee)
         platform.add_order(
             LimitOrder(
                 symbol=symbol,
@@ -63,7 +97,7 @@ def generate_constant_product_book(
         base_amount = _constant_product_quote(
             quote_order_size, quote_reserve, base_reserve
         )
-        sell_price = quote_order_size / base_amount * (1 - fee)
+        sell_price = quote_order_size / base_amount * (1 + fee)
 
         platform.add_order(
             LimitOrder(
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def platform():
+    platform = Platform()
+    for i in range(5):
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=10 + i, side="buy", price=100 - i)
+        )
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100 - i)
+        )
+        platform.add_order(
+            LimitOrder(
+                symbol="FOOBAR", size=20 + i, side="sell", price=Decimal("110.5") + i
+            )
+        )
+    return platform
+
+
+def test_order_book_arrays_match_order_book(platform: Platform):
+    ob = platform.order_book("FOOBAR")
+    arrays = platform.order_book_arrays("FOOBAR")
+
+    assert arrays.bid_prices.dtype == np.float64
+    assert arrays.bid_prices.flags.c_contiguous
+    assert arrays.bid_prices.tolist() == [float(level.price) for level in ob.bids]
+    assert arrays.bid_quantities.tolist() == [
+        float(level.quantity) for level in ob.bids
+    ]
+    assert arrays.ask_prices.tolist() == [float(level.price) for level in ob.asks]
+    assert arrays.ask_quantities.tolist() == [
+        float(level.quantity) for level in ob.asks
+    ]
+
+
+def test_order_book_arrays_depth(platform: Platform):
+    arrays = platform.order_book_arrays("FOOBAR", depth=2)
+    assert arrays.bid_prices.tolist() == [100, 99]
+    assert arrays.bid_quantities.tolist() == [11, 12]
+    assert len(arrays.ask_prices) == 2
+
+    # partially consume the best bid level
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=4, side="sell", price=100))
+    assert platform.order_book_arrays("FOOBAR", depth=1).bid_quantities[0] == 7
+
+
+def test_trade_tape(platform: Platform):
+    t0 = datetime(2021, 8, 1)
+    for i in range(3):
+        platform.add_order(
+            LimitOrder(
+                symbol="FOOBAR",
+                size=2,
+                side="sell",
+                price=90,
+                create_time=t0 + timedelta(seconds=i),
+            )
+        )
+
+    tape = platform.trade_tape("FOOBAR")
+    assert tape.dtype.names == (
+        "sequence",
+        "timestamp",
+        "price",
+        "amount",
+        "taker_side",
+    )
+    assert len(tape) == 3
+    assert tape["price"].tolist() == [100, 100, 100]
+    assert tape["amount"].tolist() == [2, 2, 2]
+    assert (tape["taker_side"] == -1).all()
+    assert np.all(np.diff(tape["sequence"]) > 0)
+
+    later = platform.trade_tape("FOOBAR", since=t0 + timedelta(seconds=1))
+    assert len(later) == 2
+    assert len(platform.trade_tape("FOOBAR", until=t0)) == 0
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from pumpdump.platform.candles import CandleSeries
+from pumpdump.platform.exceptions import UnrecognizedInterval
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+T0 = datetime(2021, 8, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def platform():
+    return Platform()
+
+
+def trade_at(platform: Platform, timestamp: datetime, price, size=1):
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=size, side="sell", price=price))
+    platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR", size=size, side="buy", price=price, create_time=timestamp
+        )
+    )
+
+
+def test_candles_from_trades(platform: Platform):
+    trade_at(platform, T0 + timedelta(seconds=1), 100, size=2)
+    trade_at(platform, T0 + timedelta(seconds=20), 105)
+    trade_at(platform, T0 + timedelta(seconds=40), 95)
+    trade_at(platform, T0 + timedelta(seconds=59), 101)
+    trade_at(platform, T0 + timedelta(seconds=61), 110)
+
+    candles = platform.candles("FOOBAR", "1m")
+    assert [c.open_time for c in candles] == [T0, T0 + timedelta(minutes=1)]
+
+    first = candles[0]
+    assert (first.open, first.high, first.low, first.close) == (100, 105, 95, 101)
+    assert first.volume == 5
+    assert candles[1].open == candles[1].close == 110
+
+    assert len(platform.candles("FOOBAR", "1s")) == 5
+    assert len(platform.candles("FOOBAR", "1h")) == 1
+
+
+def test_candles_range_query(platform: Platform):
+    for i in range(10):
+        trade_at(platform, T0 + timedelta(minutes=i), 100 + i)
+
+    candles = platform.candles(
+        "FOOBAR", "1m", start=T0 + timedelta(minutes=3), end=T0 + timedelta(minutes=6)
+    )
+    assert [c.close for c in candles] == [103, 104, 105]
+
+    assert platform.candles("FOOBAR", "1m", start=T0 + timedelta(hours=1)) == []
+
+
+def test_unknown_interval(platform: Platform):
+    with pytest.raises(UnrecognizedInterval):
+        platform.candles("FOOBAR", "3m")
+
+
+def test_series_bounded_window():
+    series = CandleSeries(seconds=1, max_candles=3)
+    for i in range(100):
+        series.update(i, Decimal(i), Decimal(1))
+
+    assert len(series) == 4
+    assert [start for start, _ in series.range()] == [96, 97, 98, 99]
+    assert len(series._starts) <= 2 * 4
+
+
+def test_series_late_trade():
+    series = CandleSeries(seconds=60, max_candles=10)
+    series.update(0, Decimal(10), Decimal(1))
+    series.update(180, Decimal(12), Decimal(1))
+    series.update(30, Decimal(9), Decimal(1))
+    series.update(90, Decimal(11), Decimal(1))
+
+    buckets = dict(series.range())
+    assert list(buckets) == [0, 60, 180]
+    assert buckets[0][2] == 9  # low
+    assert buckets[0][3] == 9  # close
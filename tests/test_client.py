@@ -0,0 +1,157 @@
+import asyncio
+import socket
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+uvicorn = pytest.importorskip("uvicorn")
+pytest.importorskip("websockets")
+
+from pumpdump.client import AsyncPlatformClient, PlatformClient  # noqa: E402
+from pumpdump.main import create_app  # noqa: E402
+from pumpdump.platform.exceptions import (  # noqa: E402
+    OrderNotFound,
+    UnrecognizedSymbol,
+)
+from pumpdump.platform.order import LimitOrder  # noqa: E402
+from pumpdump.platform.platform import Platform  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    platform = Platform()
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    config = uvicorn.Config(
+        create_app(platform, interval=0.01), log_level="warning", lifespan="off"
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(
+        target=server.run, kwargs={"sockets": [sock]}, daemon=True
+    )
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    yield platform, "http://127.0.0.1:%d" % sock.getsockname()[1]
+
+    server.should_exit = True
+    thread.join()
+
+
+def order(side="buy", price="100.01", size=1, user_id="1", symbol="FOOBAR"):
+    return LimitOrder(symbol=symbol, size=size, side=side, price=price, user_id=user_id)
+
+
+def test_client_mirrors_platform(server):
+    platform, url = server
+    with PlatformClient(url) as client:
+        resting = client.add_order(order("sell", size=3, user_id="0"))
+        taker = client.add_order(order("buy", size=1))
+
+        assert isinstance(taker, LimitOrder)
+        assert taker.completed
+        assert taker.trades[0].price == Decimal("100.01")
+        assert client.order_status(resting.order_id) == platform.order_status(
+            resting.order_id
+        )
+        assert client.order_book("FOOBAR").bids == platform.order_book("FOOBAR").bids
+        assert client.balance("1").balances == platform.balance("1").balances
+        assert client.quote("FOOBAR", "buy", 1) == platform.quote("FOOBAR", "buy", 1)
+        assert client.size_for_price("FOOBAR", "buy", 200).size == 2
+
+        amended = client.amend_order(resting.order_id, new_size=Decimal("2.5"))
+        assert amended.size == Decimal("2.5")
+        assert platform.order_book("FOOBAR").asks[0].quantity == Decimal("1.5")
+
+        canceled = client.cancel_order(resting.order_id, "FOOBAR")
+        assert canceled.canceled is not None
+        assert canceled.remaining == Decimal("1.5")
+        assert platform.order_book("FOOBAR").asks == []
+
+
+def test_client_raises_platform_exceptions(server):
+    _, url = server
+    with PlatformClient(url) as client:
+        with pytest.raises(OrderNotFound):
+            client.cancel_order("missing")
+        with pytest.raises(UnrecognizedSymbol):
+            client.add_order(order(symbol="NOPE"))
+        with pytest.raises(UnrecognizedSymbol):
+            client.order_book("NOPE")
+
+
+def test_add_orders_in_batches(server):
+    platform, url = server
+    orders = [order(price=f"{90 + i}") for i in range(7)]
+    orders[4] = order(symbol="NOPE")
+
+    with PlatformClient(url, batch_size=3) as client:
+        results = client.add_orders(orders)
+
+    assert [r.order_id for r in results if not isinstance(r, Exception)] == [
+        o.order_id for i, o in enumerate(orders) if i != 4
+    ]
+    assert isinstance(results[4], UnrecognizedSymbol)
+    assert len(platform.order_book("FOOBAR").bids) == 6
+
+
+def test_async_client(server):
+    platform, url = server
+
+    async def scenario():
+        async with AsyncPlatformClient(url, batch_size=10) as client:
+            results = await client.add_orders(
+                order(price=f"{50 + i % 20}") for i in range(100)
+            )
+            book = await client.order_book("FOOBAR", depth=5)
+            status = await client.order_status(results[0].order_id, "FOOBAR")
+            return results, book, status
+
+    results, book, status = asyncio.run(scenario())
+
+    assert len(results) == 100
+    assert not any(isinstance(r, Exception) for r in results)
+    assert book == platform.order_book("FOOBAR", depth=5).copy(
+        update={"timestamp": book.timestamp}
+    )
+    assert status.order_id == results[0].order_id
+
+
+def test_market_data(server):
+    platform, url = server
+    with PlatformClient(url) as client, client.market_data() as market_data:
+        market_data.subscribe("FOOBAR", depth=3)
+        assert market_data.recv(timeout=5).bids == []
+
+        client.add_order(order(price="99.5", size=2))
+        book = market_data.recv(timeout=5)
+        assert [(level.price, level.quantity) for level in book.bids] == [
+            (Decimal("99.5"), 2)
+        ]
+
+        market_data.subscribe("NOPE")
+        with pytest.raises(UnrecognizedSymbol):
+            market_data.recv(timeout=5)
+
+
+def test_async_market_data(server):
+    platform, url = server
+
+    async def scenario():
+        async with AsyncPlatformClient(url) as client:
+            async with client.market_data() as market_data:
+                await market_data.subscribe("FOOBAR")
+                books = [await market_data.recv()]
+                await client.add_order(order("sell", price="101"))
+                books.append(await market_data.recv())
+                return books
+
+    first, second = asyncio.run(scenario())
+    assert first.asks == []
+    assert [level.price for level in second.asks] == [Decimal(101)]
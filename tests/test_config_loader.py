@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+import pytest
+
+from pumpdump import config_loader
+from pumpdump._config import InitialBalance, SymbolConfig
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+@pytest.fixture
+def symbol_configs():
+    return [
+        SymbolConfig(
+            symbol=f"SYM{i}",
+            price_tick="0.01",
+            size_tick="0.001",
+            min_size="0.1",
+            base=f"BASE{i}",
+            quote="USD",
+        )
+        for i in range(5)
+    ] + [SymbolConfig(symbol="NOASSET", price_tick=1, size_tick=1, min_size=1)]
+
+
+@pytest.fixture
+def initial_balances():
+    return [
+        InitialBalance(user_id=None, balances={"USD": "1000"}),
+        InitialBalance(user_id="alice", balances={"USD": "123.45", "BASE0": "10"}),
+        InitialBalance(user_id="bob", balances={"BASE1": "0.001"}),
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".bin"])
+@pytest.mark.parametrize("trusted", [False, True])
+def test_round_trip(tmp_path, symbol_configs, initial_balances, suffix, trusted):
+    symbols_path = tmp_path / f"symbols{suffix}"
+    balances_path = tmp_path / f"balances{suffix}"
+    config_loader.write_symbol_configs(symbols_path, symbol_configs)
+    config_loader.write_initial_balances(balances_path, initial_balances)
+
+    config = config_loader.load_platform_config(
+        symbols_path, balances_path, trusted=trusted
+    )
+
+    assert list(config.symbol_configs) == [s.symbol for s in symbol_configs]
+    for expected in symbol_configs:
+        assert config.symbol_configs[expected.symbol] == expected
+    assert config.symbol_configs["SYM0"].price_tick == Decimal("0.01")
+    assert config.symbol_configs["NOASSET"].base is None
+
+    assert set(config.balance_config) == {None, "alice", "bob"}
+    assert config.balance_config["alice"].balances == {
+        "USD": Decimal("123.45"),
+        "BASE0": Decimal("10"),
+    }
+
+
+def test_loaded_config_drives_platform(tmp_path, symbol_configs, initial_balances):
+    symbols_path = tmp_path / "symbols.csv"
+    balances_path = tmp_path / "balances.csv"
+    config_loader.write_symbol_configs(symbols_path, symbol_configs)
+    config_loader.write_initial_balances(balances_path, initial_balances)
+
+    platform = Platform(config_loader.load_platform_config(symbols_path, balances_path))
+    platform.add_order(
+        LimitOrder(symbol="SYM0", size=1, side="sell", price=10, user_id="alice")
+    )
+
+    assert platform.balance("alice").balances["BASE0"].reserved == 1
+    assert platform.balance("carol").balances["USD"].available == 1000
+
+
+def test_balances_default_entry_added(tmp_path):
+    path = tmp_path / "balances.jsonl"
+    path.write_text('{"user_id": "alice", "balances": {"USD": 1.5}}\n')
+
+    balance_config = config_loader.load_balance_config(path)
+    assert balance_config["alice"].balances["USD"] == Decimal("1.5")
+    assert balance_config[None].balances == {}
+
+
+def test_invalid_record(tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text(
+        "symbol,price_tick,size_tick,min_size\n"
+        "GOOD,0.01,0.01,0.01\n"
+        "BAD,not-a-number,0.01,0.01\n"
+    )
+
+    with pytest.raises(config_loader.ConfigFileError) as e:
+        config_loader.load_symbol_configs(path)
+    assert e.value.record == 2
+
+    with pytest.raises(config_loader.ConfigFileError):
+        config_loader.load_symbol_configs(path, trusted=True)
+
+
+def test_duplicate_symbol(tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text("symbol,price_tick,size_tick,min_size\nA,0.01,0.01,0.01\nA,1,1,1\n")
+
+    with pytest.raises(config_loader.ConfigFileError):
+        config_loader.load_symbol_configs(path)
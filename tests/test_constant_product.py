@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from pumpdump.actor.constant_product import ConstantProductMaker
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+@pytest.fixture
+def platform():
+    return Platform()
+
+
+@pytest.fixture
+def maker(platform: Platform):
+    return ConstantProductMaker(
+        platform,
+        "FOOBAR",
+        starting_price=100,
+        base_reserve=1000,
+        levels=10,
+        run_interval=0.01,
+        user_id="maker",
+    )
+
+
+def take(platform: Platform, side: str, size, price) -> LimitOrder:
+    return platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR",
+            size=size,
+            side=side,
+            price=price,
+            time_in_force="ioc",
+            user_id="taker",
+        )
+    )
+
+
+def test_ladder(maker: ConstantProductMaker, platform: Platform):
+    maker.upkeep()
+
+    ob = platform.order_book("FOOBAR")
+    assert len(ob.bids) == len(ob.asks) == 10
+    assert ob.bids[0].price < 100 < ob.asks[0].price
+    # each band is worth about the same in quote
+    assert float(ob.bids[0].quantity * ob.bids[0].price) == pytest.approx(
+        float(ob.asks[-1].quantity * ob.asks[-1].price), rel=0.05
+    )
+
+
+def test_upkeep_without_fills_changes_nothing(maker: ConstantProductMaker):
+    maker.upkeep()
+    stats = maker.stats.copy()
+    maker.upkeep()
+    assert maker.stats == stats
+
+
+def test_fills_move_the_curve(maker: ConstantProductMaker, platform: Platform):
+    maker.upkeep()
+    stats = maker.stats.copy()
+
+    taker = take(platform, "buy", 2, 101)
+    assert taker.dealt == 2
+    maker.upkeep()
+
+    assert maker.base_reserve == pytest.approx(1000 - 2)
+    paid = sum(trade.amount * trade.price for trade in taker.trades)
+    assert maker.quote_reserve == pytest.approx(100_000 + float(paid))
+    assert maker.price > 100
+    # only the bands the price crossed were requoted, where cancelling and
+    # replacing the whole ladder would take 40 calls
+    assert sum((maker.stats - stats).values()) <= 10
+
+    ob = platform.order_book("FOOBAR")
+    # the part of the current band on one side may be below the minimum size
+    assert 9 <= len(ob.bids) <= 10 and 9 <= len(ob.asks) <= 10
+    assert ob.bids[0].price < maker.price < ob.asks[0].price
+
+    take(platform, "sell", 2, 99)
+    maker.upkeep()
+
+    # back where it started, keeping the fees
+    assert maker.base_reserve == pytest.approx(1000)
+    assert maker.quote_reserve > 100_000
+
+
+def test_constant_product_run(maker: ConstantProductMaker, platform: Platform):
+    maker.start()
+    time.sleep(0.1)
+    take(platform, "buy", 5, 105)
+    time.sleep(0.1)
+    maker.stop_flag.set()
+    maker.join()
+
+    assert not maker.exception
+    assert maker.base_reserve == pytest.approx(1000 - 5)
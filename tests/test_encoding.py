@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from pumpdump.encoding import encode, encode_book
+from pumpdump.model_utils import json_dumps
+from pumpdump.platform.order import LimitOrder, StopLimitOrder, StopMarketOrder
+from pumpdump.platform.order_book import OrderBook
+from pumpdump.platform.platform import Platform
+
+
+@pytest.fixture
+def platform():
+    platform = Platform()
+    for i in range(5):
+        platform.add_order(
+            LimitOrder(
+                symbol="FOOBAR", size="1.5", side="buy", price=f"99.{i}", user_id="0"
+            )
+        )
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=2, side="sell", price=101 + i)
+        )
+    return platform
+
+
+def test_encode_matches_json_dumps(platform: Platform):
+    taker = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=3, side="buy", price=102, ttl=60)
+    )
+    stop = platform.add_order(
+        StopLimitOrder(
+            symbol="FOOBAR", size=1, side="sell", stop_price=90, price=89, user_id="0"
+        )
+    )
+    values = [
+        taker,
+        stop,
+        StopMarketOrder(symbol="FOOBAR", size=1, side="buy", stop_price=110),
+        platform.balance("0"),
+        platform.order_book("FOOBAR"),
+        platform.trades("FOOBAR"),
+        [{"order": taker}, {"error": "OrderNotFound", "detail": ""}],
+        {"size": Decimal("1.10"), "price": None, "ok": True, "n": 1.5},
+    ]
+    try:
+        LimitOrder(symbol="FOOBAR", size=-1, side="buy", price=1)
+    except ValidationError as e:
+        values.append(e.errors())
+
+    for value in values:
+        assert encode(value) == json_dumps(value).encode()
+
+
+def test_order_book_json(platform: Platform):
+    engine = platform.trading_engine["FOOBAR"]
+    encoded = platform.order_book_json("FOOBAR", depth=3)
+    data = json.loads(encoded)
+    book = engine.order_book_snapshot(3).copy(
+        update={"timestamp": datetime.fromisoformat(data["timestamp"])}
+    )
+    assert encoded == json_dumps(book).encode()
+    assert OrderBook.parse_raw(encoded) == book
+
+    # unchanged books are not encoded again
+    assert platform.order_book_json("FOOBAR", depth=3) is encoded
+    assert platform.order_book_json("FOOBAR") is not encoded
+
+    order = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price="99.5")
+    )
+    changed = platform.order_book_json("FOOBAR", depth=3)
+    assert json.loads(changed)["bids"][0] == {"price": "99.5", "quantity": "1"}
+
+    for change in (
+        lambda: platform.amend_order(order.order_id, new_size="0.5"),
+        lambda: platform.add_order(
+            LimitOrder(symbol="FOOBAR", size="0.1", side="sell", price=99)
+        ),
+        lambda: platform.cancel_order(order.order_id),
+    ):
+        change()
+        assert platform.order_book_json("FOOBAR", depth=3) != changed
+        changed = platform.order_book_json("FOOBAR", depth=3)
+
+
+def test_encode_book():
+    assert json.loads(
+        encode_book(
+            "FOOBAR",
+            [(Decimal("99.50"), Decimal(3))],
+            [],
+            datetime(2021, 1, 1),
+        )
+    ) == {
+        "symbol": "FOOBAR",
+        "bids": [{"price": "99.50", "quantity": "3"}],
+        "asks": [],
+        "timestamp": "2021-01-01T00:00:00",
+    }
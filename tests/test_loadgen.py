@@ -0,0 +1,85 @@
+import json
+import threading
+
+import pytest
+
+from pumpdump import loadgen
+from pumpdump.platform.platform import Platform
+
+
+def test_latency_histogram():
+    histogram = loadgen.LatencyHistogram()
+    for micros in range(1, 1001):
+        histogram.record(micros * 1e-6)
+
+    assert histogram.total == 1000
+    assert histogram.max == pytest.approx(1e-3)
+    assert histogram.percentile(50) == pytest.approx(500e-6, rel=0.06)
+    assert histogram.percentile(99) == pytest.approx(990e-6, rel=0.06)
+    assert histogram.percentile(100) == pytest.approx(1e-3)
+
+
+def test_run_scenario():
+    scenario = loadgen.Scenario(
+        symbols=2,
+        users=3,
+        duration=None,
+        operations=300,
+        seed=1,
+        actors=[
+            loadgen.ActorSpec(type="random_walk", count=2, params={"run_interval": 0}),
+            loadgen.ActorSpec(type="quoter", params={"run_interval": 0, "max_open": 5}),
+            loadgen.ActorSpec(type="book_poller", params={"run_interval": 0}),
+            loadgen.ActorSpec(
+                type="constant_product",
+                params={"run_interval": 0, "base_reserve": 1000},
+            ),
+        ],
+    )
+    report = loadgen.run_scenario(scenario)
+
+    assert not report["actor_errors"]
+    assert report["operations"] >= 300
+    assert report["latency"]["add_order"]["count"] > 0
+    assert report["latency"]["cancel_order"]["count"] > 0
+    assert report["latency"]["order_book"]["p50"] > 0
+    assert report["lock"]["acquisitions"] > 0
+    assert report["trading_users"] == 3
+    assert "ops/s" in loadgen.format_report(report)
+
+
+def test_users_shared_by_trading_actors():
+    scenario = loadgen.Scenario(
+        users=10,
+        actors=[
+            loadgen.ActorSpec(type="book_poller"),
+            loadgen.ActorSpec(type="random_walk", count=2),
+        ],
+    )
+    actors = loadgen.build_actors(
+        scenario, Platform(scenario.platform_config()), threading.Event()
+    )
+    # no more users trade than there are trading actors
+    assert [actor.user_id for actor in actors[1:]] == ["user0", "user1"]
+
+
+def test_unknown_actor_type():
+    scenario = loadgen.Scenario(actors=[loadgen.ActorSpec(type="nope")])
+    with pytest.raises(ValueError):
+        loadgen.run_scenario(scenario)
+
+
+def test_main(tmp_path):
+    scenario_path = tmp_path / "scenario.json"
+    scenario_path.write_text(
+        json.dumps({"name": "tiny", "actors": [{"type": "quoter", "count": 2}]})
+    )
+    report_path = tmp_path / "report.json"
+
+    assert (
+        loadgen.main(
+            [str(scenario_path), "--duration", "0.2", "--json", str(report_path)]
+        )
+        == 0
+    )
+    assert json.loads(report_path.read_text())["scenario"]["name"] == "tiny"
@@ -0,0 +1,52 @@
+import pytest
+
+from pumpdump import montecarlo
+from pumpdump.loadgen import ActorSpec
+
+
+@pytest.fixture
+def scenario():
+    return montecarlo.SimulationScenario(
+        symbols=2,
+        users=2,
+        seed=3,
+        steps=50,
+        sample_every=5,
+        actors=[
+            ActorSpec(type="random_walk", count=2),
+            ActorSpec(type="quoter", params={"max_open": 5}),
+        ],
+    )
+
+
+def test_run_simulation(scenario):
+    summary = montecarlo.run_simulation(scenario)
+
+    assert not summary.actor_errors
+    assert summary.seed == 3
+    assert set(summary.price_path) == {"SYM0", "SYM1"}
+    assert len(summary.price_path["SYM0"]) == 11
+    assert all(p is not None and p > 0 for p in summary.price_path["SYM0"])
+    assert summary.max_spread["SYM0"] >= summary.mean_spread["SYM0"] > 0
+    assert set(summary.final_balances) == {"user0", "user1"}
+    assert sum(summary.trade_count.values()) > 0
+
+
+def test_run_simulation_reproducible(scenario):
+    first = montecarlo.run_simulation(scenario)
+    second = montecarlo.run_simulation(scenario)
+    assert first.price_path == second.price_path
+
+
+def test_runner(scenario):
+    with montecarlo.MonteCarloRunner(max_workers=2) as runner:
+        summaries = list(runner.run_seeds(scenario, range(4)))
+        # the same pool serves a second batch
+        summaries += list(runner.run_seeds(scenario, range(4, 6)))
+
+    assert sorted(s.seed for s in summaries) == list(range(6))
+
+    report = montecarlo.aggregate(summaries)
+    assert report["runs"] == 6
+    assert report["runs_with_errors"] == 0
+    assert report["final_price"]["SYM0"]["min"] > 0
@@ -0,0 +1,131 @@
+import sqlite3
+import time
+from decimal import Decimal
+
+import pytest
+
+from pumpdump.persistence import SqliteSink
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+
+@pytest.fixture
+def platform():
+    return Platform()
+
+
+def rows(path, query):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(query).fetchall()
+
+
+def test_sink_persists_events(tmp_path, platform: Platform):
+    path = tmp_path / "events.db"
+    sink = SqliteSink(path, batch_size=3)
+    sink.start()
+    platform.listeners.append(sink)
+
+    resting = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=5, side="sell", price="100.5", user_id="0")
+    )
+    for _ in range(3):
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=1, side="buy", price=101, user_id="1")
+        )
+    platform.cancel_order(resting.order_id)
+    sink.close()
+
+    assert not sink.exception
+    assert sink.written == 8
+    assert sink.dropped == 0
+
+    assert rows(path, "PRAGMA journal_mode") == [("wal",)]
+    orders = rows(path, "SELECT order_id, side, price, size FROM orders")
+    assert len(orders) == 4
+    assert (resting.order_id, "sell", "100.5", "5") in orders
+
+    trades = rows(path, "SELECT sequence, price, amount FROM trades ORDER BY sequence")
+    assert [(Decimal(p), Decimal(a)) for _, p, a in trades] == [
+        (Decimal("100.5"), 1)
+    ] * 3
+
+    assert rows(path, "SELECT order_id, remaining FROM cancels") == [
+        (resting.order_id, "2")
+    ]
+
+
+def test_sink_drops_when_full(tmp_path, platform: Platform):
+    path = tmp_path / "events.db"
+    sink = SqliteSink(path, max_queue=2)
+    platform.listeners.append(sink)
+
+    # the writer is not running yet, so the queue fills up
+    for i in range(5):
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100 - i)
+        )
+    assert sink.dropped == 3
+
+    sink.start()
+    sink.flush()
+    assert sink.written == 2
+    sink.close()
+
+
+def test_sink_block_timeout(tmp_path, platform: Platform):
+    sink = SqliteSink(
+        tmp_path / "events.db", max_queue=1, policy="block", block_timeout=0.01
+    )
+    platform.listeners.append(sink)
+    for i in range(2):
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100 - i)
+        )
+    assert sink.dropped == 1
+
+
+def test_sink_block_without_writer(tmp_path, platform: Platform):
+    sink = SqliteSink(
+        tmp_path / "events.db", max_queue=1, policy="block", block_timeout=60
+    )
+    sink.start()
+    sink.close()
+    platform.listeners.append(sink)
+
+    # the writer has stopped, so nothing waits for it to make room
+    start = time.monotonic()
+    for i in range(3):
+        platform.add_order(
+            LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100 - i)
+        )
+    sink.close()
+    assert time.monotonic() - start < 10
+    assert sink.dropped == 2
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_flush_after_writer_failed(tmp_path, platform: Platform):
+    # a directory cannot be opened as a database
+    sink = SqliteSink(tmp_path, poll_interval=0.01)
+    platform.listeners.append(sink)
+    sink.start()
+    sink.join(timeout=5)
+    assert isinstance(sink.exception, sqlite3.OperationalError)
+
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+    with pytest.raises(RuntimeError):
+        sink.flush()
+    sink.close()
+
+
+def test_flush_without_writer(tmp_path, platform: Platform):
+    sink = SqliteSink(tmp_path / "events.db")
+    platform.listeners.append(sink)
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+    sink.flush()
+    assert sink.written == 0
+
+
+def test_unknown_policy(tmp_path):
+    with pytest.raises(ValueError):
+        SqliteSink(tmp_path / "events.db", policy="explode")
@@ -1,7 +1,14 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
 import pytest
 
-from pumpdump.platform.order import LimitOrder
-from pumpdump.platform.platform import Platform
+from pumpdump._config import PlatformConfig, SymbolConfig
+from pumpdump.platform.exceptions import InsufficientBalance, UnrecognizedSymbol
+from pumpdump.platform.order import LimitOrder, StopLimitOrder, StopMarketOrder
+from pumpdump.platform.platform import Platform, PlatformListener
 
 
 @pytest.fixture
@@ -38,3 +45,312 @@ def test_balance_trade(platform: Platform):
     balance = platform.balance("0")
     assert balance.balances["FOO"].available == 1e12 - 200
     assert balance.balances["BAR"].available == 1e12 + 20000
+
+
+@pytest.fixture
+def large_config():
+    return PlatformConfig(
+        symbol_configs={
+            f"SYM{i}": SymbolConfig(
+                symbol=f"SYM{i}",
+                price_tick="0.01",
+                size_tick="0.01",
+                min_size="0.01",
+                base=f"BASE{i}",
+                quote="USD",
+            )
+            for i in range(100)
+        }
+    )
+
+
+def test_trading_engines_created_lazily(large_config: PlatformConfig):
+    platform = Platform(large_config)
+    assert len(platform.trading_engine) == 100
+    assert "SYM5" in platform.trading_engine
+    assert not platform.trading_engine.loaded()
+
+    platform.order_book("SYM5")
+    assert list(platform.trading_engine.loaded()) == ["SYM5"]
+    assert platform.trading_engine["SYM5"] is platform.trading_engine["SYM5"]
+
+    with pytest.raises(UnrecognizedSymbol):
+        platform.order_book("NOPE")
+
+
+def test_order_status_by_symbol(platform: Platform):
+    order = LimitOrder(symbol="FOOBAR", size=1, side="buy", price="100")
+    platform.add_order(order)
+
+    assert platform.order_status(order.order_id, "FOOBAR") is order
+    assert platform.order_status(order.order_id) is order
+
+
+def test_lazy_package_import():
+    code = (
+        "import sys, pumpdump; "
+        "assert 'pydantic' not in sys.modules; "
+        "assert 'pumpdump.actor.random_walk' not in sys.modules; "
+        "pumpdump.Platform; "
+        "assert 'pumpdump.platform.platform' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cancel_releases_reservation(platform: Platform):
+    order = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=200, side="buy", price="100", user_id="0")
+    )
+    assert platform.balance("0").balances["BAR"].reserved == 20000
+
+    canceled = platform.cancel_order(order.order_id)
+    assert canceled is order
+    assert order.canceled
+
+    balance = platform.balance("0")
+    assert balance.balances["BAR"].reserved == 0
+    assert balance.balances["BAR"].available == 1e12
+    assert platform.order_book("FOOBAR").bids == []
+
+
+def test_price_improvement_returned(platform: Platform):
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price="90"))
+    platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price="100", user_id="0")
+    )
+
+    balance = platform.balance("0")
+    assert balance.balances["BAR"].reserved == 0
+    assert balance.balances["BAR"].available == 1e12 - 90
+
+
+def test_stop_limit_order_balances(platform: Platform):
+    stop = platform.add_order(
+        StopLimitOrder(
+            symbol="FOOBAR",
+            size=2,
+            side="buy",
+            price="105",
+            stop_price="100",
+            user_id="0",
+        )
+    )
+    assert platform.balance("0").balances["BAR"].reserved == 210
+
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=3, side="sell", price="100"))
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price="100"))
+
+    assert platform.order_status(stop.order_id).completed
+    balance = platform.balance("0")
+    assert balance.balances["FOO"].available == 1e12 + 2
+    assert balance.balances["BAR"].reserved == 0
+    assert balance.balances["BAR"].available == 1e12 - 200
+
+
+def test_stop_market_limited_to_balance(platform: Platform):
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=100))
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=200, side="sell", price="1e10"))
+
+    # triggers on placement, with enough BAR for only 100 at 1e10
+    stop = platform.add_order(
+        StopMarketOrder(
+            symbol="FOOBAR", size=200, side="buy", stop_price=100, user_id="1"
+        )
+    )
+    assert stop.dealt == 100
+    assert stop.canceled
+    balance = platform.balance("1")
+    assert balance.balances["BAR"].available == 0
+    assert balance.balances["FOO"].available == 1e12 + 100
+    assert platform.order_book("FOOBAR").asks[0].quantity == 100
+
+
+def test_stop_markets_triggered_together_share_balance(platform: Platform):
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=100))
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+    first, second = (
+        platform.add_order(
+            StopMarketOrder(
+                symbol="FOOBAR", size="6e11", side="sell", stop_price=90, user_id="1"
+            )
+        )
+        for _ in range(2)
+    )
+    platform.add_order(LimitOrder(symbol="FOOBAR", size="2e12", side="buy", price=50))
+
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=50))
+    assert first.dealt == Decimal("6e11")
+    assert second.dealt == Decimal("4e11")
+    assert second.canceled
+    assert platform.balance("1").balances["FOO"].available == 0
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = datetime(2021, 1, 1)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class Cancels(PlatformListener):
+    def __init__(self) -> None:
+        self.canceled = []
+
+    def on_cancel(self, order) -> None:
+        self.canceled.append(order)
+
+
+def test_expired_orders_release_reservation():
+    clock = Clock()
+    platform = Platform(clock=clock)
+    listener = Cancels()
+    platform.listeners.append(listener)
+
+    order = platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR",
+            size=2,
+            side="buy",
+            price="100",
+            user_id="0",
+            create_time=clock.now,
+            ttl=60,
+        )
+    )
+    assert platform.balance("0").balances["BAR"].reserved == 200
+
+    clock.now += timedelta(seconds=59)
+    assert platform.expire_orders() == []
+    assert len(platform.order_book("FOOBAR").bids) == 1
+
+    clock.now += timedelta(seconds=1)
+    assert platform.order_book("FOOBAR").bids == []
+    assert listener.canceled == [order]
+    assert order.canceled == clock.now
+    balance = platform.balance("0")
+    assert balance.balances["BAR"].reserved == 0
+    assert balance.balances["BAR"].available == 1e12
+
+
+def test_ttl_from_clock():
+    clock = Clock()
+    platform = Platform(clock=clock)
+    order = platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR", size=2, side="buy", price="100", user_id="0", ttl=60
+        )
+    )
+    assert order.create_time == clock.now
+    assert order.expire_time == clock.now + timedelta(seconds=60)
+
+    clock.now += timedelta(seconds=60)
+    assert platform.order_book("FOOBAR").bids == []
+    assert order.canceled == clock.now
+    assert platform.balance("0").balances["BAR"].reserved == 0
+
+    ioc = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=98, time_in_force="ioc")
+    )
+    assert ioc.canceled == ioc.create_time == clock.now
+
+
+def test_cancel_times_from_clock():
+    clock = Clock()
+    platform = Platform(clock=clock)
+    resting = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=99, user_id="0")
+    )
+    ioc = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=98, time_in_force="ioc")
+    )
+    assert ioc.canceled == clock.now
+
+    clock.now += timedelta(seconds=1)
+    platform.cancel_order(resting.order_id)
+    assert resting.canceled == clock.now
+
+    clock.now += timedelta(seconds=1)
+    resting = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=99, user_id="0")
+    )
+    platform.cancel_all_orders(user_id="0")
+    assert resting.canceled == clock.now
+
+
+def test_immediate_or_cancel_releases_reservation(platform: Platform):
+    listener = Cancels()
+    platform.listeners.append(listener)
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price="99"))
+
+    order = platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR",
+            size=3,
+            side="buy",
+            price="100",
+            user_id="0",
+            time_in_force="ioc",
+        )
+    )
+    assert order.dealt == 1
+    assert listener.canceled == [order]
+    balance = platform.balance("0")
+    assert balance.balances["BAR"].reserved == 0
+    assert balance.balances["BAR"].available == 1e12 - 99
+
+
+def test_amend_adjusts_reservation(platform: Platform):
+    order = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=200, side="buy", price="100", user_id="0")
+    )
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=50, side="sell", price="100"))
+
+    platform.amend_order(order.order_id, new_size=100)
+    balance = platform.balance("0").balances["BAR"]
+    assert balance.reserved == 50 * 100
+    assert balance.available == 1e12 - 100 * 100
+
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=10, side="sell", price="101"))
+    amended = platform.amend_order(order.order_id, new_price="102", new_size="110")
+    assert amended is order
+    # bought 10 at 101 after the reprice, leaving 50 at 102
+    balance = platform.balance("0").balances["BAR"]
+    assert balance.reserved == 50 * 102
+    assert balance.available == 1e12 - 50 * 100 - 10 * 101 - 50 * 102
+
+    with pytest.raises(InsufficientBalance):
+        platform.amend_order(order.order_id, new_size="1e12")
+    assert platform.balance("0").balances["BAR"].reserved == 50 * 102
+
+    platform.cancel_order(order.order_id)
+    assert platform.balance("0").balances["BAR"].reserved == 0
+
+
+def test_amend_requeue_time_from_clock():
+    clock = Clock()
+    platform = Platform(clock=clock)
+    order = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=99, user_id="0")
+    )
+
+    clock.now += timedelta(seconds=1)
+    platform.amend_order(order.order_id, new_price=98)
+    assert order.requeued == clock.now
+
+
+def test_amended_order_queues_behind_on_platform_clock():
+    # the platform clock is years behind the wall clock
+    platform = Platform(clock=Clock())
+    first = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=98, user_id="0")
+    )
+    second = platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="buy", price=99, user_id="0")
+    )
+    platform.amend_order(first.order_id, new_price=99)
+
+    platform.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=99))
+    assert second.completed
+    assert first.dealt == 0
@@ -0,0 +1,98 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from pumpdump._config import PlatformConfig, SymbolConfig
+from pumpdump.actor import replay
+from pumpdump.actor.replay import Replay, ReplayRecord
+from pumpdump.platform.platform import Platform
+
+RECORDS = [
+    ReplayRecord(1000.0, "add", "FOOBAR", "b1", "buy", Decimal("99.5"), Decimal(2)),
+    ReplayRecord(1000.5, "add", "FOOBAR", "a1", "sell", Decimal("100.5"), Decimal(3)),
+    ReplayRecord(1001.0, "add", "BAZQUX", "q1", "sell", Decimal("10"), Decimal(5)),
+    ReplayRecord(1001.5, "trade", "FOOBAR", "t1", "buy", Decimal("100.5"), Decimal(1)),
+    ReplayRecord(1002.0, "cancel", "FOOBAR", "b1"),
+    ReplayRecord(1002.5, "add", "UNKNOWN", "u1", "buy", Decimal(1), Decimal(1)),
+    ReplayRecord(1003.0, "cancel", "FOOBAR", "b1"),
+]
+
+
+@pytest.fixture
+def platform():
+    return Platform(
+        PlatformConfig(
+            symbol_configs={
+                symbol: SymbolConfig(
+                    symbol=symbol, price_tick="0.01", size_tick="0.01", min_size="0.01"
+                )
+                for symbol in ("FOOBAR", "BAZQUX")
+            }
+        )
+    )
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "flow.csv"
+    lines = [",".join(replay.CSV_COLUMNS)]
+    for record in RECORDS:
+        lines.append(",".join("" if v is None else str(v) for v in record))
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    path = tmp_path / "flow.bin"
+    replay.write_binary_records(path, RECORDS)
+    return path
+
+
+@pytest.fixture(params=["csv_file", "binary_file"])
+def replay_file(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_iter_records(replay_file):
+    assert list(replay.iter_records(replay_file)) == RECORDS
+
+
+def test_small_chunks(csv_file, binary_file):
+    assert list(replay.iter_csv_records(csv_file, chunk_size=16)) == RECORDS
+    assert list(replay.iter_binary_records(binary_file, chunk_records=2)) == RECORDS
+
+
+def test_replay(platform: Platform, replay_file):
+    bot = Replay(platform, replay_file, speed=None)
+    bot.replay()
+
+    assert bot.stats == {
+        "add": 3,
+        "trade": 1,
+        "cancel": 1,
+        "skipped": 1,
+        "rejected": 1,
+    }
+
+    foobar = platform.order_book("FOOBAR")
+    assert foobar.bids == []
+    assert [(a.price, a.quantity) for a in foobar.asks] == [(Decimal("100.5"), 2)]
+    assert platform.order_book("BAZQUX").asks[0].quantity == 5
+
+    trades = platform.trades("FOOBAR").trades
+    assert len(trades) == 1
+    assert trades[0].timestamp == replay.EPOCH + timedelta(seconds=1001.5)
+
+
+def test_replay_paced(platform: Platform, replay_file):
+    bot = Replay(platform, replay_file, speed=100)
+    start = time.monotonic()
+    bot.start()
+    bot.join(timeout=5)
+
+    assert not bot.exception
+    assert time.monotonic() - start >= 0.03
+    assert bot.stats["add"] == 3
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.platform import Platform
+
+T0 = datetime(2021, 8, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def platform():
+    return Platform()
+
+
+def trade_at(platform: Platform, timestamp: datetime, maker=None, taker=None):
+    platform.add_order(
+        LimitOrder(symbol="FOOBAR", size=1, side="sell", price=100, user_id=maker)
+    )
+    platform.add_order(
+        LimitOrder(
+            symbol="FOOBAR",
+            size=1,
+            side="buy",
+            price=100,
+            user_id=taker,
+            create_time=timestamp,
+        )
+    )
+
+
+def test_trades_pagination(platform: Platform):
+    for i in range(25):
+        trade_at(platform, T0 + timedelta(seconds=i))
+
+    seen = []
+    cursor = None
+    while True:
+        page = platform.trades("FOOBAR", limit=10, cursor=cursor)
+        seen.extend(page.trades)
+        cursor = page.next_cursor
+        if not page.has_more:
+            break
+
+    assert len(seen) == 25
+    assert [t.sequence for t in seen] == sorted(t.sequence for t in seen)
+    assert all(t.symbol == "FOOBAR" for t in seen)
+
+    # the cursor from the last page picks up trades added afterwards
+    trade_at(platform, T0 + timedelta(seconds=30))
+    page = platform.trades("FOOBAR", cursor=cursor)
+    assert len(page.trades) == 1
+    assert page.trades[0].timestamp == T0 + timedelta(seconds=30)
+
+
+def test_trades_time_range(platform: Platform):
+    for i in range(10):
+        trade_at(platform, T0 + timedelta(minutes=i))
+
+    page = platform.trades(
+        "FOOBAR", since=T0 + timedelta(minutes=2), until=T0 + timedelta(minutes=5)
+    )
+    assert [t.timestamp for t in page.trades] == [
+        T0 + timedelta(minutes=i) for i in (2, 3, 4)
+    ]
+    assert not page.has_more
+
+
+def test_trades_time_range_out_of_order(platform: Platform):
+    for seconds in (10, 5, 20, 15, 30, 12):
+        trade_at(platform, T0 + timedelta(seconds=seconds))
+
+    def offsets(trades):
+        return [int((t.timestamp - T0).total_seconds()) for t in trades]
+
+    since, until = T0 + timedelta(seconds=8), T0 + timedelta(seconds=18)
+    page = platform.trades("FOOBAR", since=since, until=until)
+    assert offsets(page.trades) == [10, 15, 12]
+
+    seen = []
+    cursor = None
+    while True:
+        page = platform.trades("FOOBAR", since=since, limit=2, cursor=cursor)
+        seen.extend(page.trades)
+        cursor = page.next_cursor
+        if not page.has_more:
+            break
+    assert offsets(seen) == [10, 20, 15, 30, 12]
+
+    engine = platform.trading_engine["FOOBAR"]
+    assert offsets(engine.trade_index.between(until=until)) == [10, 5, 15, 12]
+
+
+def test_my_trades(platform: Platform):
+    trade_at(platform, T0, maker="alice", taker="bob")
+    trade_at(platform, T0 + timedelta(seconds=1), maker="bob", taker="carol")
+    trade_at(platform, T0 + timedelta(seconds=2), maker="alice", taker="alice")
+
+    alice = platform.my_trades("alice").trades
+    assert len(alice) == 2
+    assert alice[1].maker_order_id != alice[1].taker_order_id
+
+    bob = platform.my_trades("bob").trades
+    assert [t.timestamp for t in bob] == [T0, T0 + timedelta(seconds=1)]
+    assert bob[0].taker_side == "buy"
+
+    assert platform.my_trades("nobody").trades == []
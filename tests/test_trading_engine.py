@@ -1,8 +1,14 @@
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytest
 
-from pumpdump.platform.order import LimitOrder
+from pumpdump.platform.exceptions import (
+    InvalidAmendment,
+    OrderAlreadyCanceled,
+    OrderAlreadyCompleted,
+)
+from pumpdump.platform.order import LimitOrder, StopLimitOrder, StopMarketOrder
 from pumpdump.platform.trading_engine import TradingEngine
 
 
@@ -68,3 +74,308 @@ def test_crossing_order(engine_with_orders: TradingEngine):
     assert len(order.trades) == 1
     assert order.trades[0].price == 110
     assert order.trades[0].amount == 100
+
+
+def test_cancel_order(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    best_bid = engine._bids.best
+    assert engine.cancel_order(best_bid.order_id) is best_bid
+
+    with pytest.raises(OrderAlreadyCanceled):
+        engine.cancel_order(best_bid.order_id)
+
+    ob = engine.order_book
+    assert len(ob.bids) == 9
+    assert ob.bids[0].price == 99
+
+    # the canceled order is no longer matched against
+    order = LimitOrder(symbol="FOOBAR", size=50, side="sell", price=99)
+    engine.add_limit_order(order)
+    assert order.completed
+    assert order.trades[0].price == 99
+
+
+def test_filled_orders_completed(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    maker = engine._asks.best
+    order = LimitOrder(symbol="FOOBAR", size=100, side="buy", price=110)
+    engine.add_limit_order(order)
+
+    assert engine.order_status(order.order_id).completed
+    assert maker.order_id not in engine._open_orders
+    with pytest.raises(OrderAlreadyCompleted):
+        engine.cancel_order(maker.order_id)
+
+
+def test_stop_limit_order(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    stop = StopLimitOrder(
+        symbol="FOOBAR", size=50, side="buy", price=112, stop_price=111
+    )
+    assert engine.add_order(stop) == []
+    assert engine.order_status(stop.order_id) is stop
+    assert len(engine.order_book.bids) == 10
+
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=100, side="buy", price=110))
+    assert not stop.triggered
+
+    order_trades = engine.add_order(
+        LimitOrder(symbol="FOOBAR", size=100, side="buy", price=111)
+    )
+    assert stop.triggered
+    assert stop.completed
+    assert [(o.order_id, t.price) for o, t in order_trades[2::2]] == [
+        (stop.order_id, 112)
+    ]
+    assert engine.order_book.asks[0].quantity == 50
+
+
+def test_stop_market_cascade(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    first = StopMarketOrder(symbol="FOOBAR", size=150, side="sell", stop_price=100)
+    second = StopMarketOrder(symbol="FOOBAR", size=50, side="sell", stop_price=99)
+    third = StopMarketOrder(symbol="FOOBAR", size=10, side="sell", stop_price=98)
+    untouched = StopMarketOrder(symbol="FOOBAR", size=10, side="sell", stop_price=90)
+    for stop in (third, untouched, second, first):
+        engine.add_order(stop)
+
+    order_trades = engine.add_order(
+        LimitOrder(symbol="FOOBAR", size=100, side="sell", price=100)
+    )
+
+    # the first stop is triggered by the order, the other two by the first
+    # stop's fills at 99 and 98, and run in the order they were added
+    takers = [(o.order_id, t.price, t.amount) for o, t in order_trades[::2]]
+    assert takers[1:] == [
+        (first.order_id, 99, 100),
+        (first.order_id, 98, 50),
+        (third.order_id, 98, 10),
+        (second.order_id, 98, 40),
+        (second.order_id, 97, 10),
+    ]
+    assert [t.sequence for _o, t in order_trades[::2]] == sorted(
+        t.sequence for _o, t in order_trades[::2]
+    )
+    assert untouched.triggered is None
+    assert engine.order_book.bids[0].price == 97
+
+
+def test_stop_market_remainder_canceled(engine: TradingEngine):
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=100))
+    stop = StopMarketOrder(symbol="FOOBAR", size=5, side="buy", stop_price=100)
+    engine.add_order(stop)
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=2, side="sell", price=101))
+
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+    assert stop.dealt == 2
+    assert stop.canceled == stop.triggered
+    assert engine.order_book.asks == []
+
+
+def test_stop_triggered_on_placement(engine: TradingEngine):
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=100))
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=1, side="buy", price=100))
+
+    stop = StopLimitOrder(symbol="FOOBAR", size=1, side="buy", price=99, stop_price=95)
+    engine.add_order(stop)
+    assert stop.triggered
+    assert engine.order_book.bids[0].price == 99
+
+
+def test_cancel_stop_order(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    stop = StopMarketOrder(
+        symbol="FOOBAR", size=10, side="buy", stop_price=110, user_id="0"
+    )
+    engine.add_order(stop)
+    assert engine.cancel_all("0") == [stop]
+    with pytest.raises(OrderAlreadyCanceled):
+        engine.cancel_order(stop.order_id)
+
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=100, side="buy", price=110))
+    assert stop.trades == []
+
+
+def test_immediate_or_cancel(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    order = LimitOrder(
+        symbol="FOOBAR", size=250, side="buy", price=111, time_in_force="ioc"
+    )
+    engine.add_order(order)
+
+    assert order.dealt == 200
+    assert order.canceled
+    assert engine.take_canceled() == [order]
+    assert engine.order_book.bids[0].price == 100
+
+    order = LimitOrder(
+        symbol="FOOBAR", size=10, side="buy", price=105, time_in_force="ioc"
+    )
+    engine.add_order(order)
+    assert order.trades == []
+    assert engine.take_canceled() == [order]
+    assert engine.take_canceled() == []
+
+
+def test_fill_or_kill(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    killed = LimitOrder(
+        symbol="FOOBAR", size=301, side="sell", price=98, time_in_force="fok"
+    )
+    engine.add_order(killed)
+    assert killed.trades == []
+    assert killed.canceled
+    assert engine.order_book.bids[0].quantity == 100
+
+    filled = LimitOrder(
+        symbol="FOOBAR", size=300, side="sell", price=98, time_in_force="fok"
+    )
+    engine.add_order(filled)
+    assert filled.completed
+    assert engine.order_book.bids[0].price == 97
+
+
+def test_good_till_date(engine: TradingEngine):
+    now = datetime(2021, 1, 1)
+    orders = [
+        LimitOrder(
+            symbol="FOOBAR",
+            size=1,
+            side="buy",
+            price=90 + i,
+            create_time=now,
+            ttl=timedelta(seconds=i),
+        )
+        for i in range(1, 6)
+    ]
+    for order in orders:
+        engine.add_order(order)
+    # fills the best bid before it expires, so it is skipped when it comes due
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=1, side="sell", price=95))
+
+    assert engine.next_expiry == now + timedelta(seconds=1)
+    assert engine.expire_orders(now) == []
+
+    expired = engine.expire_orders(now + timedelta(seconds=3))
+    assert expired == orders[:3]
+    assert [o.canceled for o in expired] == [o.expire_time for o in expired]
+    assert [level.price for level in engine.order_book.bids] == [94]
+    with pytest.raises(OrderAlreadyCanceled):
+        engine.cancel_order(orders[0].order_id)
+
+    assert engine.expire_orders(now + timedelta(days=1)) == [orders[3]]
+    assert engine.next_expiry is None
+
+
+def test_good_till_date_stop(engine: TradingEngine):
+    stop = StopLimitOrder(
+        symbol="FOOBAR",
+        size=1,
+        side="buy",
+        price=100,
+        stop_price=100,
+        expire_time=datetime(2021, 1, 1),
+    )
+    engine.add_order(stop)
+    assert engine.expire_orders(datetime(2021, 1, 1)) == [stop]
+    assert stop.canceled
+
+
+def test_amend_size_down_keeps_priority(engine: TradingEngine):
+    first = LimitOrder(symbol="FOOBAR", size=100, side="buy", price=100)
+    second = LimitOrder(symbol="FOOBAR", size=100, side="buy", price=100)
+    engine.add_order(first)
+    engine.add_order(second)
+
+    assert engine.amend_order(first.order_id, size=Decimal(40)) == []
+    assert first.requeued is None
+    assert engine.order_book.bids[0].quantity == 140
+
+    sell = LimitOrder(symbol="FOOBAR", size=50, side="sell", price=100)
+    engine.add_order(sell)
+    assert [trade.maker_order_id for trade in sell.trades] == [
+        first.order_id,
+        second.order_id,
+    ]
+    assert first.completed
+    assert engine.order_book.bids[0].quantity == 90
+
+
+def test_amend_requeues(engine: TradingEngine):
+    first = LimitOrder(symbol="FOOBAR", size=100, side="buy", price=100)
+    second = LimitOrder(symbol="FOOBAR", size=100, side="buy", price=100)
+    engine.add_order(first)
+    engine.add_order(second)
+
+    engine.amend_order(first.order_id, size=Decimal(150))
+    assert first.requeued
+    assert engine.order_book.bids[0].quantity == 250
+    sell = LimitOrder(symbol="FOOBAR", size=50, side="sell", price=100)
+    engine.add_order(sell)
+    assert sell.trades[0].maker_order_id == second.order_id
+
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=30, side="sell", price=102))
+    trades = engine.amend_order(first.order_id, price=Decimal(103))
+    assert [trade.amount for _order, trade in trades[::2]] == [30]
+    book = engine.order_book
+    assert [(level.price, level.quantity) for level in book.bids] == [
+        (103, 120),
+        (100, 50),
+    ]
+    assert book.asks == []
+
+
+def test_amend_invalid(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+    order = LimitOrder(symbol="FOOBAR", size=100, side="sell", price=99)
+    engine.add_order(order)
+    assert order.completed
+    with pytest.raises(OrderAlreadyCompleted):
+        engine.amend_order(order.order_id, size=Decimal(200))
+
+    bid = engine.order_book.bids[0]
+    resting = engine._bids.best
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=30, side="sell", price=98))
+    with pytest.raises(InvalidAmendment):
+        engine.amend_order(resting.order_id, size=Decimal(30))
+    with pytest.raises(InvalidAmendment):
+        engine.amend_order(resting.order_id, price=Decimal(0))
+    assert engine.order_book.bids[0].quantity == bid.quantity - 30
+
+    stop = StopMarketOrder(symbol="FOOBAR", size=10, side="buy", stop_price=120)
+    engine.add_order(stop)
+    with pytest.raises(InvalidAmendment):
+        engine.amend_order(stop.order_id, price=Decimal(121))
+    engine.amend_order(stop.order_id, size=Decimal(5))
+    assert stop.size == 5
+
+
+def test_quote(engine_with_orders: TradingEngine):
+    engine = engine_with_orders
+
+    quote = engine.quote("buy", Decimal(250))
+    assert quote.levels == 3
+    assert quote.worst_price == 112
+    assert quote.notional == 100 * 110 + 100 * 111 + 50 * 112
+    assert quote.vwap == quote.notional / 250
+    assert quote.unfilled == 0
+
+    quote = engine.quote("sell", Decimal(1500))
+    assert (quote.size, quote.levels, quote.unfilled) == (1000, 10, 500)
+    assert quote.worst_price == 91
+
+    # the quotes follow the book as it changes
+    engine.add_order(LimitOrder(symbol="FOOBAR", size=150, side="buy", price=111))
+    assert engine.quote("buy", Decimal(250)).worst_price == 113
+
+    quote = engine.size_for_price("sell", Decimal("97.5"))
+    assert (quote.size, quote.levels, quote.worst_price) == (300, 3, 98)
+    assert engine.size_for_price("sell", Decimal(101)).levels == 0
+    assert engine.quote("buy", Decimal(1)).worst_price == 111
+
+
+def test_quote_empty_book(engine: TradingEngine):
+    quote = engine.quote("buy", Decimal(5))
+    assert (quote.size, quote.levels, quote.unfilled, quote.vwap) == (0, 0, 5, None)
+    with pytest.raises(ValueError):
+        engine.quote("buy", Decimal(0))
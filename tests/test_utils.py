@@ -1,4 +1,6 @@
 import math
+import random
+from decimal import Decimal
 
 import pytest
 
@@ -23,3 +25,23 @@ def test_populate_order_book(platform: Platform):
     assert ob
     assert len(ob.bids) == 30
     assert len(ob.asks) == 30
+
+
+def test_populate_order_book_starting_price(platform: Platform):
+    utils.generate_constant_product_book(
+        "FOOBAR", platform, starting_price=Decimal(50), base_reserve=Decimal(1e6)
+    )
+    ob = platform.order_book("FOOBAR")
+    mid = (ob.bids[0].price + ob.asks[0].price) / 2
+    assert math.isclose(mid, 50, rel_tol=0.01)
+
+
+def test_populate_order_book_seeded():
+    books = []
+    for _ in range(2):
+        platform = Platform()
+        utils.generate_constant_product_book("FOOBAR", platform, rng=random.Random(7))
+        books.append(platform.order_book("FOOBAR"))
+
+    assert books[0].bids == books[1].bids
+    assert books[0].asks == books[1].asks